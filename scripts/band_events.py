@@ -0,0 +1,207 @@
+# band_events.py  (ASCII-only)
+# Debounced band-transition events for streams of (m, a) outputs
+#
+# Instead of one line per reading, only emit an event when a channel's lane
+# moves between A+ (calm), A0 (borderline) and A- (stressed) as defined by
+# classify_band in run_all_laws.py. A new band must hold for at least
+# min_dwell seconds AND min_count consecutive readings before the
+# transition is confirmed; brief excursions are swallowed.
+#
+# Per-channel state lives in flat arrays (band, pending band, pending count,
+# pending since): 14 bytes per channel. Arbitrary channel ids go through a
+# dict, which for short string ids costs another ~100-120 bytes per channel
+# (id string, int slot, hash entry) and dominates at a million channels.
+# With dense=True channel ids are the ints 0..n-1 and index the arrays
+# directly, so the whole state stays at 14 bytes per channel.
+#
+# Input stream (text, comma separated, '#' lines ignored):
+#     channel, t, m, a
+#
+# Usage:
+#     python band_events.py readings.csv [--min-dwell 2.0] [--min-count 3]
+#     python band_events.py --demo 2000000 --channels 100000
+
+import argparse
+import math
+import random
+import sys
+import time
+from array import array
+
+
+BANDS = ("A+ (calm)", "A0 (borderline)", "A- (stressed)")
+
+
+def band_index(a):
+    """0, 1, 2 for A+, A0, A- (same thresholds as run_all_laws.classify_band)."""
+    x = abs(a)
+    if x < 0.20:
+        return 0
+    elif x < 0.50:
+        return 1
+    else:
+        return 2
+
+
+class BandEventDetector:
+    """
+    Debounced band tracker for many channels.
+
+    feed(channel, t, m, a) returns None or an event tuple
+        (channel, t, from_band, to_band, m, a)
+    where from_band is None for a channel's first reading (only emitted
+    when emit_initial=True). With dense=True, channels must be ints >= 0
+    and are used as array slots without an id map.
+    """
+
+    def __init__(self, min_dwell=0.0, min_count=1, emit_initial=False, dense=False):
+        self.min_dwell = float(min_dwell)
+        self.min_count = max(1, int(min_count))
+        self.emit_initial = emit_initial
+        self.dense = dense
+        self.slots = {}
+        self.band = array("b")
+        self.pending = array("b")
+        self.count = array("I")
+        self.since = array("d")
+        self.readings = 0
+        self.events = 0
+
+    @property
+    def channels(self):
+        """Number of channels seen so far."""
+        if self.dense:
+            return sum(1 for b in self.band if b >= 0)
+        return len(self.slots)
+
+    def _slot(self, channel):
+        if self.dense:
+            if channel < 0:
+                raise ValueError(f"dense channel ids must be ints >= 0, got {channel!r}")
+            grow = channel + 1 - len(self.band)
+            if grow > 0:
+                self.band.extend([-1] * grow)
+                self.pending.extend([-1] * grow)
+                self.count.extend([0] * grow)
+                self.since.extend([0.0] * grow)
+            return channel
+        slot = self.slots.get(channel)
+        if slot is None:
+            slot = self.slots[channel] = len(self.band)
+            self.band.append(-1)
+            self.pending.append(-1)
+            self.count.append(0)
+            self.since.append(0.0)
+        return slot
+
+    def feed(self, channel, t, m, a):
+        self.readings += 1
+        k = self._slot(channel)
+        b = band_index(a)
+        cur = self.band[k]
+
+        if cur < 0:
+            self.band[k] = b
+            if self.emit_initial:
+                self.events += 1
+                return (channel, t, None, BANDS[b], m, a)
+            return None
+
+        if b == cur:
+            self.pending[k] = -1
+            return None
+
+        if b != self.pending[k]:
+            self.pending[k] = b
+            self.count[k] = 1
+            self.since[k] = t
+        elif self.count[k] < self.min_count:
+            self.count[k] += 1   # capped: only "reached min_count" matters
+
+        if self.count[k] >= self.min_count and t - self.since[k] >= self.min_dwell:
+            self.band[k] = b
+            self.pending[k] = -1
+            self.events += 1
+            return (channel, t, BANDS[cur], BANDS[b], m, a)
+        return None
+
+    def current(self, channel):
+        """Confirmed band label for a channel, or None if unseen."""
+        if self.dense:
+            k = channel if 0 <= channel < len(self.band) else None
+        else:
+            k = self.slots.get(channel)
+        if k is None or self.band[k] < 0:
+            return None
+        return BANDS[self.band[k]]
+
+
+def read_readings(path):
+    """Yield (channel, t, m, a) from a text file ('-' for stdin)."""
+    f = sys.stdin if path == "-" else open(path, "r")
+    try:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            ch, t_s, m_s, a_s = [p.strip() for p in line.split(",")[:4]]
+            yield ch, float(t_s), float(m_s), float(a_s)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def synthetic_readings(n, n_channels, seed=34):
+    """Slowly drifting lanes with jitter; channels reported round-robin."""
+    rng = random.Random(seed)
+    phase = [rng.uniform(0.0, 2.0 * math.pi) for _ in range(n_channels)]
+    for i in range(n):
+        ch = i % n_channels
+        t = 0.1 * (i // n_channels)
+        a = 0.35 + 0.30 * math.sin(0.05 * t + phase[ch]) + rng.gauss(0.0, 0.04)
+        yield ch, t, 1.0, a
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Debounced band-transition events.")
+    ap.add_argument("path", nargs="?", help="readings: channel, t, m, a ('-' = stdin)")
+    ap.add_argument("--min-dwell", type=float, default=0.0,
+                    help="seconds a new band must hold before it is confirmed")
+    ap.add_argument("--min-count", type=int, default=1,
+                    help="consecutive readings a new band must hold")
+    ap.add_argument("--emit-initial", action="store_true",
+                    help="also emit each channel's first band")
+    ap.add_argument("--quiet", action="store_true", help="print only the summary")
+    ap.add_argument("--demo", type=int, default=0,
+                    help="feed N synthetic readings instead of a file")
+    ap.add_argument("--channels", type=int, default=1000,
+                    help="channel count in --demo mode")
+    args = ap.parse_args()
+
+    if args.demo > 0:
+        readings = synthetic_readings(args.demo, args.channels)
+    elif args.path:
+        readings = read_readings(args.path)
+    else:
+        ap.error("give a readings file (or '-') or --demo N")
+
+    # demo channels are already dense ints 0..channels-1
+    det = BandEventDetector(args.min_dwell, args.min_count, args.emit_initial,
+                            dense=args.demo > 0)
+    feed = det.feed
+    t0 = time.perf_counter()
+    for ch, t, m, a in readings:
+        ev = feed(ch, t, m, a)
+        if ev is not None and not args.quiet:
+            ch_e, t_e, b_from, b_to, m_e, a_e = ev
+            print(f"{ch_e},{t_e!r},{b_from},{b_to},m={m_e:.4f},a={a_e:+.4f}")
+    elapsed = time.perf_counter() - t0
+
+    ratio = det.readings / det.events if det.events else float("inf")
+    print(f"[events] channels={det.channels} readings={det.readings} "
+          f"events={det.events} reduction={ratio:.0f}x "
+          f"({det.readings / max(elapsed, 1e-9):,.0f} readings/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# batch_L08_snell_raytrace.py  (ASCII-only)
+# Law L08: batched Snell's law ray tracing through a stack of layers
+# Classical (forward form): sin(theta_out) = n_in * sin(theta_in) / n_out
+#
+# Rays are processed layer by layer across the whole batch, so the per-layer
+# constants (index ratio, index rapidities) are computed once per interface.
+# A ray whose |sin(theta_out)| exceeds 1 is totally internally reflected at
+# that interface and stops there.
+#
+# Input files (text, comma separated, '#' lines ignored):
+#     rays:    theta_deg, a_theta       (one ray per line)
+#     layers:  n_m, n_a                 (first line = incident medium)
+#
+# Usage:
+#     python batch_L08_snell_raytrace.py rays.csv layers.csv [--out exit.csv]
+#     python batch_L08_snell_raytrace.py --demo 1000000 --layers-n 20
+
+import argparse
+import math
+import random
+import time
+
+from result_store import add_store_option, store_results
+
+
+def clamp(a, e=1e-6):
+    return max(-1 + e, min(1 - e, float(a)))
+
+
+def atanh_c(a_raw, eps=1e-6):
+    """atanh(clamp_a(a)) written as 0.5 * ln((1+a)/(1-a))."""
+    a = clamp(a_raw, eps)
+    return 0.5 * math.log((1.0 + a) / (1.0 - a))
+
+
+def ssm_align_weighted(pairs, gamma=1.0, eps=1e-12):
+    """
+    pairs: iterable of (a_raw, m)
+    weight w := |m|^gamma
+    """
+    U = 0.0
+    W = 0.0
+    for a_raw, m in pairs:
+        a = clamp(a_raw)
+        # atanh(a) = 0.5 * ln((1+a)/(1-a))
+        u = 0.5 * math.log((1.0 + a) / (1.0 - a))
+        w = abs(float(m)) ** gamma
+        U += w * u
+        W += w
+    return math.tanh(U / max(W, eps))
+
+
+def read_pairs(path):
+    """Read 'x, y' lines into two float lists."""
+    xs, ys = [], []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            x_s, y_s = line.split(",")[:2]
+            xs.append(float(x_s))
+            ys.append(float(y_s))
+    return xs, ys
+
+
+def trace_batch(theta_deg, a_theta, layers, eps=1e-6):
+    """
+    Trace a batch of rays through len(layers) - 1 interfaces.
+
+    theta_deg, a_theta: per-ray incident angle (degrees) and alignment
+    layers: list of (n_m, n_a), layers[0] is the incident medium
+
+    Lane per interface (same verbs as scenario_L08, solved for theta_out):
+        a_num       := tanh(atanh(n_in_a_c) + atanh(a_theta_in_c))
+        a_theta_out := tanh(atanh(a_num_c) - atanh(n_out_a_c))
+
+    Returns (theta_out_deg, a_out, tir_at):
+        theta_out_deg  exit angle in degrees, or nan if the ray was reflected
+        a_out          lane after the last interface the ray crossed
+        tir_at         interface index where TIR happened, or -1
+    """
+    if len(layers) < 2:
+        raise ValueError("need at least two layers (one interface)")
+
+    lo = -1.0 + eps
+    hi = 1.0 - eps
+    u_max = atanh_c(1.0, eps)
+    n_rays = len(theta_deg)
+
+    # work in sin(theta) and rapidity space for the whole batch
+    s = [math.sin(math.radians(t)) for t in theta_deg]
+    u = [
+        0.5 * math.log((1.0 + a) / (1.0 - a))
+        for a in (lo if x < lo else hi if x > hi else x for x in a_theta)
+    ]
+    tir_at = [-1] * n_rays
+    u_tir = {}
+
+    for i in range(len(layers) - 1):
+        n_in_m, n_in_a = layers[i]
+        n_out_m, n_out_a = layers[i + 1]
+        r = n_in_m / n_out_m
+        c = atanh_c(n_in_a, eps)
+        d = atanh_c(n_out_a, eps)
+
+        s = [x * r for x in s]
+        if r > 1.0 and (max(s) > 1.0 or min(s) < -1.0):
+            for j, x in enumerate(s):
+                if x > 1.0 or x < -1.0:
+                    tir_at[j] = i
+                    u_tir[j] = u[j]
+                    s[j] = 0.0   # reflected rays ride along as zeros
+
+        # lane: product with n_in, then division by n_out (both clamped)
+        u = [
+            u_max if v > u_max else -u_max if v < -u_max else v
+            for v in (x + c for x in u)
+        ]
+        u = [
+            u_max if v > u_max else -u_max if v < -u_max else v
+            for v in (x - d for x in u)
+        ]
+
+    for j, v in u_tir.items():
+        u[j] = v
+
+    theta_out = [math.degrees(math.asin(x)) for x in s]
+    for j in u_tir:
+        theta_out[j] = float("nan")
+    a_out = [math.tanh(v) for v in u]
+    return theta_out, a_out, tir_at
+
+
+def demo_batch(n_rays, n_layers, seed=8):
+    """Random rays through a random stack of n_layers interfaces."""
+    rng = random.Random(seed)
+    theta = [rng.uniform(0.0, 60.0) for _ in range(n_rays)]
+    a_theta = [rng.uniform(0.05, 0.40) for _ in range(n_rays)]
+    layers = [(1.500, +0.01)]   # start inside glass so some rays hit TIR
+    for _ in range(n_layers):
+        layers.append((rng.uniform(1.00, 1.90), rng.uniform(0.00, 0.08)))
+    return theta, a_theta, layers
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Batched Snell's law ray tracer (L08).")
+    ap.add_argument("rays", nargs="?", help="rays file: theta_deg, a_theta")
+    ap.add_argument("layers", nargs="?", help="layers file: n_m, n_a")
+    ap.add_argument("--out", help="write theta_out_deg, a_out, tir_at per ray")
+    ap.add_argument("--demo", type=int, default=0,
+                    help="trace N random rays instead of reading files")
+    ap.add_argument("--layers-n", type=int, default=20,
+                    help="number of interfaces in --demo mode")
+    add_store_option(ap)
+    args = ap.parse_args()
+
+    if args.demo > 0:
+        theta, a_theta, layers = demo_batch(args.demo, args.layers_n)
+    elif args.rays and args.layers:
+        theta, a_theta = read_pairs(args.rays)
+        n_m, n_a = read_pairs(args.layers)
+        layers = list(zip(n_m, n_a))
+    else:
+        ap.error("give rays and layers files, or --demo N")
+
+    t0 = time.perf_counter()
+    theta_out, a_out, tir_at = trace_batch(theta, a_theta, layers)
+    elapsed = time.perf_counter() - t0
+
+    if args.out:
+        with open(args.out, "w") as f:
+            f.writelines(
+                f"{t!r},{a!r},{k}\n" for t, a, k in zip(theta_out, a_out, tir_at)
+            )
+
+    passed = [(a, t) for t, a, k in zip(theta_out, a_out, tir_at) if k < 0]
+    n_tir = len(theta_out) - len(passed)
+    theta_mean = sum(t for _, t in passed) / len(passed) if passed else 0.0
+    a_exit = ssm_align_weighted(passed, gamma=1.0, eps=1e-12)
+
+    print("Classical:")
+    print("  rays       =", len(theta_out))
+    print("  interfaces =", len(layers) - 1)
+    print("  TIR        =", n_tir)
+    print("  theta_exit =", f"{theta_mean:.3f}", "deg (mean of transmitted rays)")
+
+    print("SSM (exit angle lane, pooled by |theta_exit|):")
+    print("  theta_exit =", f"m={theta_mean:.3f}, a={a_exit:+.4f}")
+    print("  elapsed    =", f"{elapsed:.2f}", "s")
+
+    print("SSM:", f"m={theta_mean:.3f}, a={a_exit:+.4f}")
+    store_results(args, [("L08", theta_mean, a_exit)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+# calibrate_lanes.py  (ASCII-only)
+# Monte Carlo calibration of alignment lanes from magnitude uncertainty
+#
+# The scenarios assign input lanes by hand (R_a = +0.10, V_a = +0.10, ...).
+# Here they are derived from measurement noise instead:
+#
+# 1) Draw the magnitude inputs of a law from user noise models and push the
+#    draws through the classical formula (the m-nodes of the law's reactive
+#    graph, evaluated column-wise in chunks; with numpy installed the
+#    draws come from numpy's generator and every node runs on whole numpy
+#    columns, otherwise lists and the random module are used). The output
+#    spread is
+#        cv_out := std(m_out) / |mean(m_out)|
+#    except for laws whose output balances to ~0 by design (L06 delta_p):
+#    there the spread is taken against the momentum in play,
+#        cv_out := std(m_out) / |p_before|     (nominal)
+# 2) Turn that spread into a target lane with the same mapping used for
+#    residual drift: cv_ref reads exactly on the A0 / A- boundary,
+#        a_target := tanh( atanh(0.50) * cv_out / cv_ref )
+# 3) Give every input lane the form a_i := tanh(k * cv_i), where cv_i is
+#    that input's own relative noise, and fit the single scale k so that the
+#    law's lane chain returns a_target.
+#
+# Noise models (relative to the scenario value unless marked abs):
+#     gauss:S        x * (1 + S * N(0,1))
+#     uniform:H      x * (1 + U(-H, +H))
+#     abs-gauss:S    x + S * N(0,1)
+#     exact          no noise
+#
+# Usage:
+#     python calibrate_lanes.py [L04 L07 ...] [--draws 1000000] [--workers 4]
+#         [--noise L04.T1_m=gauss:0.02 --noise L04.R_m=exact ...] [--default gauss:0.01]
+#         [--no-numpy]
+
+import argparse
+import math
+import multiprocessing as mp
+import random
+import time
+import types
+
+try:
+    import numpy as np
+except ImportError:   # optional: vectorized sampling and node evaluation
+    np = None
+
+from reactive_laws import BUILDERS, ReactiveGraph, classify_band
+from result_store import add_store_option, store_results
+
+
+CHUNK = 1 << 15
+NP_CHUNK = 1 << 18
+
+# laws whose output is ~0 by conservation: measure the spread against the
+# nominal value of this node instead of the output mean
+REF_NODES = {"L06": "p_before_m"}
+
+
+def parse_noise(spec):
+    """'gauss:0.02' -> ('gauss', 0.02); 'exact' -> ('exact', 0.0)."""
+    if spec == "exact":
+        return ("exact", 0.0)
+    kind, _, val = spec.partition(":")
+    if kind not in ("gauss", "uniform", "abs-gauss") or not val:
+        raise ValueError(f"bad noise model: {spec!r}")
+    return (kind, float(val))
+
+
+def relative_cv(kind, val, nominal):
+    """Relative standard deviation implied by a noise model at nominal value."""
+    if kind == "exact" or nominal == 0.0:
+        return 0.0   # relative models leave a zero input untouched; abs has no scale
+    if kind == "gauss":
+        return val
+    if kind == "uniform":
+        return val / math.sqrt(3.0)
+    return val / abs(nominal)
+
+
+def sampler(kind, val, nominal, rng):
+    """Return f(n) -> list of n draws for one input."""
+    if kind == "exact":
+        return lambda n: [nominal] * n
+    if kind == "gauss":
+        g = rng.gauss
+        return lambda n: [nominal * (1.0 + val * g(0.0, 1.0)) for _ in range(n)]
+    if kind == "uniform":
+        u = rng.uniform
+        return lambda n: [nominal * (1.0 + u(-val, val)) for _ in range(n)]
+    g = rng.gauss
+    return lambda n: [nominal + val * g(0.0, 1.0) for _ in range(n)]
+
+
+def sampler_np(kind, val, nominal, rng):
+    """Return f(n) -> numpy array of n draws for one input."""
+    if kind == "exact":
+        return lambda n: np.full(n, nominal)
+    if kind == "gauss":
+        return lambda n: nominal * (1.0 + val * rng.standard_normal(n))
+    if kind == "uniform":
+        return lambda n: nominal * (1.0 + rng.uniform(-val, val, n))
+    return lambda n: nominal + val * rng.standard_normal(n)
+
+
+def column_fn(fn):
+    """
+    Node function for whole numpy columns: the m-node lambdas are plain
+    arithmetic plus math.* calls, so re-binding them with numpy standing in
+    for math makes them array-wise. Nodes that still reject arrays are
+    evaluated element by element.
+    """
+    col = types.FunctionType(fn.__code__, dict(fn.__globals__, math=np),
+                             fn.__name__, fn.__defaults__, fn.__closure__)
+
+    def run(*cols):
+        try:
+            return np.asarray(col(*cols), dtype=float)
+        except TypeError:
+            return np.fromiter((fn(*args) for args in zip(*cols)), float, len(cols[0]))
+    return run
+
+
+def ancestors(g, node):
+    """Node ids the given node depends on (inclusive), in topological order."""
+    seen = {node}
+    stack = [node]
+    while stack:
+        for p in g.parents[stack.pop()]:
+            if p not in seen:
+                seen.add(p)
+                stack.append(p)
+    return sorted(seen)
+
+
+def monte_carlo(g, m_out, noise, draws, seed, vectorized=None):
+    """
+    Evaluate the classical output over `draws` noisy input draws in chunks.
+    Returns (mean, std) of the output magnitude. vectorized=None uses the
+    numpy path when numpy is importable.
+    """
+    if vectorized is None:
+        vectorized = np is not None
+    if vectorized:
+        return _monte_carlo_np(g, m_out, noise, draws, seed)
+    rng = random.Random(seed)
+    order = ancestors(g, g.ids[m_out])
+    samplers = {}
+    for i in order:
+        if g.fns[i] is None:
+            kind, val = noise[g.names[i]]
+            samplers[i] = sampler(kind, val, g.values[i], rng)
+
+    out = g.ids[m_out]
+    shift = g.values[out]          # nominal output, keeps the sums well scaled
+    s1 = 0.0
+    s2 = 0.0
+    done = 0
+    while done < draws:
+        n = min(CHUNK, draws - done)
+        cols = {}
+        for i in order:
+            if i in samplers:
+                cols[i] = samplers[i](n)
+            else:
+                fn = g.fns[i]
+                cols[i] = [fn(*args) for args in zip(*(cols[p] for p in g.parents[i]))]
+        col = cols[out]
+        s1 += math.fsum(x - shift for x in col)
+        s2 += math.fsum((x - shift) ** 2 for x in col)
+        done += n
+
+    d1 = s1 / draws
+    mean = shift + d1
+    var = max(0.0, s2 / draws - d1 * d1) * draws / max(1, draws - 1)
+    return mean, math.sqrt(var)
+
+
+def _monte_carlo_np(g, m_out, noise, draws, seed):
+    """numpy version of monte_carlo(): the same chunked mean / std."""
+    rng = np.random.default_rng(seed)
+    order = ancestors(g, g.ids[m_out])
+    samplers = {}
+    fns = {}
+    for i in order:
+        if g.fns[i] is None:
+            kind, val = noise[g.names[i]]
+            samplers[i] = sampler_np(kind, val, g.values[i], rng)
+        else:
+            fns[i] = column_fn(g.fns[i])
+
+    out = g.ids[m_out]
+    shift = g.values[out]
+    s1 = 0.0
+    s2 = 0.0
+    done = 0
+    while done < draws:
+        n = min(NP_CHUNK, draws - done)
+        cols = {}
+        for i in order:
+            if i in samplers:
+                cols[i] = samplers[i](n)
+            else:
+                cols[i] = fns[i](*(cols[p] for p in g.parents[i]))
+        dev = cols[out] - shift
+        s1 += float(dev.sum())
+        s2 += float(np.dot(dev, dev))
+        done += n
+
+    d1 = s1 / draws
+    mean = shift + d1
+    var = max(0.0, s2 / draws - d1 * d1) * draws / max(1, draws - 1)
+    return mean, math.sqrt(var)
+
+
+def fit_scale(g, a_out, lane_cv, a_target, k_max=200.0, steps=400):
+    """
+    Find k so that setting every input lane to tanh(k * cv_i) makes the
+    output lane equal a_target. Coarse scan for a sign change, then
+    bisection; falls back to the closest k when the target is unreachable.
+    """
+    def lane_at(k):
+        g.set_many({name: math.tanh(k * cv) for name, cv in lane_cv.items()})
+        return g.get(a_out)
+
+    def err(k):
+        return abs(lane_at(k)) - abs(a_target)
+
+    ks = [k_max * j / steps for j in range(steps + 1)]
+    errs = [err(k) for k in ks]
+    for j in range(steps):
+        if errs[j] == 0.0:
+            return ks[j], lane_at(ks[j])
+        if (errs[j] < 0.0) != (errs[j + 1] < 0.0):
+            lo, hi = ks[j], ks[j + 1]
+            e_lo = errs[j]
+            for _ in range(60):
+                mid = 0.5 * (lo + hi)
+                e_mid = err(mid)
+                if (e_mid < 0.0) == (e_lo < 0.0):
+                    lo, e_lo = mid, e_mid
+                else:
+                    hi = mid
+            k = 0.5 * (lo + hi)
+            return k, lane_at(k)
+    j = min(range(len(ks)), key=lambda j: abs(errs[j]))
+    return ks[j], lane_at(ks[j])
+
+
+def calibrate_law(job):
+    """
+    Worker entry: calibrate one law.
+    job = (index, noise_specs, default, draws, cv_ref, vectorized).
+    """
+    index, specs, default, draws, cv_ref, vectorized = job
+    build = BUILDERS[index]
+    g = ReactiveGraph()
+    m_out, a_out = build(g)
+    prefix = m_out.split(".")[0]
+
+    noise = {}
+    lane_cv = {}
+    for name, i in g.ids.items():
+        if g.fns[i] is not None or not name.endswith("_m"):
+            continue
+        kind, val = parse_noise(specs.get(name, default))
+        noise[name] = (kind, val)
+        lane_cv[name[:-2] + "_a"] = relative_cv(kind, val, g.values[i])
+
+    t0 = time.perf_counter()
+    mean, std = monte_carlo(g, m_out, noise, draws, seed=38 + index, vectorized=vectorized)
+    elapsed = time.perf_counter() - t0
+
+    ref = REF_NODES.get(prefix)
+    scale = abs(g.get(f"{prefix}.{ref}")) if ref else abs(mean)
+    cv_out = std / scale if scale else math.inf
+    a_target = math.tanh(0.5 * math.log(3.0) * cv_out / cv_ref)
+    k, a_fit = fit_scale(g, a_out, lane_cv, a_target)
+    lanes = {name: math.tanh(k * cv) for name, cv in lane_cv.items()}
+    return prefix, ref, mean, std, cv_out, a_target, k, a_fit, lanes, elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Monte Carlo lane calibration (L01..L10).")
+    ap.add_argument("laws", nargs="*", help="law ids, e.g. L04 L07 (default: all)")
+    ap.add_argument("--draws", type=int, default=100000)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--default", default="gauss:0.01",
+                    help="noise model for inputs without --noise")
+    ap.add_argument("--noise", action="append", default=[],
+                    help="per-input model, e.g. L04.T1_m=gauss:0.02")
+    ap.add_argument("--cv-ref", type=float, default=0.02,
+                    help="output relative spread that maps to |a| = 0.50")
+    ap.add_argument("--no-numpy", action="store_true",
+                    help="use the pure-Python sampler even if numpy is installed")
+    add_store_option(ap)
+    args = ap.parse_args()
+
+    specs = {}
+    for item in args.noise:
+        name, _, spec = item.partition("=")
+        parse_noise(spec)
+        specs[name.strip()] = spec.strip()
+    parse_noise(args.default)
+
+    known = set()
+    for build in BUILDERS:
+        g = ReactiveGraph()
+        build(g)
+        known.update(n for n, i in g.ids.items() if g.fns[i] is None and n.endswith("_m"))
+    unknown = sorted(set(specs) - known)
+    if unknown:
+        ap.error(f"--noise names no magnitude input: {', '.join(unknown)}"
+                 " (expected e.g. L04.T1_m)")
+
+    ids = [b.__name__[6:] for b in BUILDERS]
+    wanted = args.laws or ids
+    for law in wanted:
+        if law not in ids:
+            ap.error(f"unknown law: {law}")
+    vectorized = np is not None and not args.no_numpy
+    jobs = [
+        (ids.index(law), specs, args.default, args.draws, args.cv_ref, vectorized)
+        for law in wanted
+    ]
+
+    workers = max(1, min(len(jobs), args.workers or mp.cpu_count()))
+    t0 = time.perf_counter()
+    if workers == 1:
+        results = [calibrate_law(j) for j in jobs]
+    else:
+        with mp.Pool(workers) as pool:
+            results = pool.map(calibrate_law, jobs)
+    elapsed = time.perf_counter() - t0
+
+    for prefix, ref, mean, std, cv_out, a_target, k, a_fit, lanes, t_law in results:
+        print(f"--- {prefix} ---")
+        cv_of = f" of {ref}" if ref else ""
+        print("Classical:", f"mean={mean:.6g}, std={std:.4g}, cv={cv_out:.4%}{cv_of}",
+              f"({args.draws} draws, {t_law:.2f} s)")
+        print("Calibrated input lanes (k =", f"{k:.3f}):")
+        for name, a in lanes.items():
+            print(f"  {name.split('.', 1)[1]:12s} {a:+.4f}")
+        print("SSM:", f"target a={a_target:+.4f} [{classify_band(a_target)}],",
+              f"fitted a={a_fit:+.4f} [{classify_band(a_fit)}]")
+        print()
+    print(f"[calibrate] {len(results)} laws in {elapsed:.2f} s using {workers} worker(s)",
+          "(numpy)" if vectorized else "(pure Python)")
+    store_results(args, [(r[0], r[2], r[7]) for r in results])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+# fixed_point_lane.py  (ASCII-only)
+# Deterministic integer fixed-point kernel for the alignment lane a
+#
+# Float helpers use math.log / math.tanh, whose last bits depend on the
+# platform libm. This kernel keeps a and u = atanh(a) as signed integers in
+# Q-format (value = int / 2^F) and builds clamp, atanh, tanh and the
+# sum / product / division / weighted pooling verbs from integer +, -, *,
+# // and shifts only, so results are bit-identical on every machine.
+#
+#     ln(x)    := k*ln2 + 2*atanh_series((y-1)/(y+1)),  x = 2^k * y, y in [1,2)
+#     atanh(a) := 0.5 * ln((1+a)/(1-a))
+#     tanh(U)  := (1 - e) / (1 + e),  e := exp(-2|U|) by ln2 range reduction
+#
+# Internals run with G guard bits and round half-up back to Q(F); odd
+# symmetry is kept exactly by working on |a| and |U|. Pooling weights are
+# |m| (gamma = 1) rescaled by one common power of two, so the largest lies
+# in [0.5, 1), and then converted to Q(F).
+#
+# Usage:
+#     python fixed_point_lane.py [--frac-bits 30] [--guard-bits 8]
+#         prints the float-vs-fixed error budget for L01..L10 plus a digest
+#         of the fixed results for cross-machine comparison.
+
+import argparse
+import hashlib
+import math
+import random
+
+
+def clamp(a, e=1e-6):
+    return max(-1 + e, min(1 - e, float(a)))
+
+
+def classify_band(a):
+    """Simple band policy based on |a| (same as run_all_laws.py)."""
+    x = abs(a)
+    if x < 0.20:
+        return "A+ (calm)"
+    elif x < 0.50:
+        return "A0 (borderline)"
+    else:
+        return "A- (stressed)"
+
+
+class FloatLane:
+    """Reference float path: the same helpers as the scenario scripts."""
+
+    def __init__(self, eps_a=1e-6, eps_w=1e-12):
+        self.eps_a = eps_a
+        self.eps_w = eps_w
+
+    def lane(self, a):
+        return float(a)
+
+    def to_float(self, a):
+        return a
+
+    def atanh(self, a_raw):
+        a = clamp(a_raw, self.eps_a)
+        return 0.5 * math.log((1.0 + a) / (1.0 - a))
+
+    def tanh(self, u):
+        return math.tanh(u)
+
+    def ssm_align_sum(self, a_list):
+        return math.tanh(sum(self.atanh(a) for a in a_list))
+
+    def ssm_align_product(self, a1, a2):
+        return self.ssm_align_sum([a1, a2])
+
+    def ssm_align_div(self, a_num, a_den):
+        return math.tanh(self.atanh(a_num) - self.atanh(a_den))
+
+    def ssm_align_weighted(self, pairs):
+        U = 0.0
+        W = 0.0
+        for a, m in pairs:
+            w = abs(float(m))
+            U += w * self.atanh(a)
+            W += w
+        return math.tanh(U / max(W, self.eps_w))
+
+
+class FixedLane:
+    """
+    Integer Q(F) path. Lanes, rapidities and weights are Python ints
+    scaled by 2^F; lane() / to_float() convert at the edges only.
+
+    With F = 30 every lane and every pooling weight fits in int32, every
+    rapidity (|u| <= atanh(1 - eps_a) ~ 7.25) and every weighted term w * u
+    fits in int64, and the weighted sum U over n pairs needs 64 + log2(n)
+    bits: a hardware port needs a 128-bit accumulator for U and W.
+
+    The elementary functions run at P = F + G bits and build numerators of
+    up to 2P + 1 bits before dividing back to P: (one_p + x) << P in
+    atanh, (y - one_p) << P in ln, (one_p - e) << P in tanh, and the
+    P x P series products in ln / exp. That is 77 bits at the defaults
+    (P = 38), so a bit-exact port needs 128-bit intermediates there (a
+    64x64->128 multiply and a 128/64 divide), or F + G <= 31 to keep every
+    intermediate in int64 (e.g. frac_bits=24, guard_bits=7).
+    """
+
+    def __init__(self, frac_bits=30, guard_bits=8, eps_a=1e-6, eps_w=1e-12):
+        if frac_bits < 8 or guard_bits < 1:
+            raise ValueError("need frac_bits >= 8 and guard_bits >= 1")
+        self.F = frac_bits
+        self.G = guard_bits
+        self.P = frac_bits + guard_bits
+        self.one = 1 << frac_bits
+        self.one_p = 1 << self.P
+        # widest unsigned intermediate inside atanh / tanh / ln / exp
+        self.intermediate_bits = 2 * self.P + 1
+
+        # float -> Q conversions are exact scalings plus round-half-even
+        eps_q = max(1, round(eps_a * 2.0 ** frac_bits))
+        self.lo = -self.one + eps_q
+        self.hi = self.one - eps_q
+        self.eps_w = max(1, round(eps_w * 2.0 ** frac_bits))
+
+        # ln2 = 2 * atanh(1/3), summed in integers at precision P
+        s = 0
+        k = 0
+        while True:
+            term = self.one_p // ((2 * k + 1) * 3 ** (2 * k + 1))
+            if term == 0:
+                break
+            s += term
+            k += 1
+        self.ln2_p = 2 * s
+
+    # -- conversions ------------------------------------------------------
+
+    def lane(self, a):
+        return round(float(a) * 2.0 ** self.F)
+
+    def to_float(self, a_q):
+        return a_q / 2.0 ** self.F
+
+    def _round_p(self, x_p):
+        """Precision P -> Q(F), round half-up (x_p >= 0)."""
+        return (x_p + (1 << (self.G - 1))) >> self.G
+
+    # -- integer elementary functions --------------------------------------
+
+    def _ln_p(self, x_p):
+        """ln(x) at precision P for x_p > 0 (also at precision P)."""
+        P = self.P
+        one_p = self.one_p
+        k = x_p.bit_length() - 1 - P
+        y = x_p >> k if k >= 0 else x_p << -k
+        z = ((y - one_p) << P) // (y + one_p)
+        z2 = (z * z) >> P
+        s = 0
+        term = z
+        n = 1
+        while term:
+            s += term // n
+            term = (term * z2) >> P
+            n += 2
+        return k * self.ln2_p + 2 * s
+
+    def _exp_neg_p(self, x_p):
+        """exp(-x) at precision P for x_p >= 0."""
+        P = self.P
+        k, r = divmod(x_p, self.ln2_p)
+        if k > P:
+            return 0
+        s = self.one_p
+        term = self.one_p
+        n = 1
+        while term:
+            term = ((term * r) >> P) // n
+            s = s - term if n & 1 else s + term
+            n += 1
+        return s >> k
+
+    def clamp(self, a_q):
+        return self.lo if a_q < self.lo else self.hi if a_q > self.hi else a_q
+
+    def atanh(self, a_q):
+        """atanh(clamp_a(a)) in Q(F)."""
+        a_q = self.clamp(a_q)
+        neg = a_q < 0
+        x = (-a_q if neg else a_q) << self.G
+        ratio = ((self.one_p + x) << self.P) // (self.one_p - x)
+        u = (self._ln_p(ratio) + (1 << self.G)) >> (self.G + 1)
+        return -u if neg else u
+
+    def tanh(self, u_q):
+        """tanh(U) in Q(F)."""
+        neg = u_q < 0
+        x = (-u_q if neg else u_q) << (self.G + 1)
+        e = self._exp_neg_p(x)
+        t = ((self.one_p - e) << self.P) // (self.one_p + e)
+        t = self._round_p(t)
+        return -t if neg else t
+
+    def atanh_array(self, a_qs):
+        atanh = self.atanh
+        return [atanh(a) for a in a_qs]
+
+    def tanh_array(self, u_qs):
+        tanh = self.tanh
+        return [tanh(u) for u in u_qs]
+
+    # -- lane verbs ---------------------------------------------------------
+
+    def ssm_align_sum(self, a_list):
+        return self.tanh(sum(self.atanh(a) for a in a_list))
+
+    def ssm_align_product(self, a1, a2):
+        return self.ssm_align_sum([a1, a2])
+
+    def ssm_align_div(self, a_num, a_den):
+        return self.tanh(self.atanh(a_num) - self.atanh(a_den))
+
+    def ssm_align_weighted(self, pairs):
+        """
+        pairs: (a_q, m) with m a float magnitude, w := |m| * 2^s in Q(F).
+
+        The common exponent s puts the largest |m| in [0.5, 1). Scaling by a
+        power of two is exact and cancels in U / W, and it keeps every
+        weight within F bits whatever the units of m (L07 pressures too).
+        """
+        pairs = [(a_q, abs(float(m))) for a_q, m in pairs]
+        shift = self.F - math.frexp(max((m for _, m in pairs), default=0.0))[1]
+        U = 0
+        W = 0
+        for a_q, m in pairs:
+            w = round(math.ldexp(m, shift))
+            U += w * self.atanh(a_q)
+            W += w
+        W = max(W, self.eps_w)
+        q = (2 * U + W) // (2 * W)
+        return self.tanh(q)
+
+
+# -- the ten bundled laws, lane chains as in scenario_L01..L10 -------------
+
+def law_L01(L):
+    a_I = L.ssm_align_weighted([(L.lane(+0.72), 1.92), (L.lane(+0.05), 1.98)])
+    return L.ssm_align_product(a_I, L.lane(+0.10))
+
+
+def law_L02(L):
+    a_acc = L.ssm_align_weighted([(L.lane(+0.65), 0.90), (L.lane(+0.10), 1.10)])
+    return L.ssm_align_product(L.lane(+0.05), a_acc)
+
+
+def law_L03(L):
+    a_x = L.ssm_align_weighted([(L.lane(+0.60), 0.045), (L.lane(+0.10), 0.055)])
+    return L.ssm_align_product(L.lane(+0.08), a_x)
+
+
+def law_L04(L):
+    a_T = L.ssm_align_weighted([(L.lane(+0.55), 295.0), (L.lane(+0.12), 305.0)])
+    a_nRT = L.ssm_align_sum([L.lane(+0.02), L.lane(+0.00), a_T])
+    return L.ssm_align_div(a_nRT, L.lane(+0.10))
+
+
+def law_L05(L):
+    a_I = L.ssm_align_weighted([(L.lane(+0.70), 1.80), (L.lane(+0.15), 1.60)])
+    a_Ein = L.ssm_align_sum([L.lane(+0.10), a_I, L.lane(+0.05)])
+    a_Eout = L.ssm_align_sum([L.lane(+0.05), L.lane(0.0), L.lane(+0.10)])
+    return L.ssm_align_sum([a_Ein, a_Eout])
+
+
+def law_L06(L):
+    m1, m2 = 1.50, 1.00
+    a_p1_before = L.ssm_align_sum([L.lane(+0.05), L.lane(+0.40)])
+    a_p2_before = L.ssm_align_sum([L.lane(+0.05), L.lane(+0.05)])
+    a_p1_after = L.ssm_align_sum([L.lane(+0.05), L.lane(+0.35)])
+    a_p2_after = L.ssm_align_sum([L.lane(+0.05), L.lane(+0.20)])
+    a_before = L.ssm_align_weighted([(a_p1_before, m1 * 1.20), (a_p2_before, m2 * 0.00)])
+    a_after = L.ssm_align_weighted([(a_p1_after, m1 * 0.70), (a_p2_after, m2 * 0.80)])
+    return L.ssm_align_sum([a_before, a_after])
+
+
+def law_L07(L):
+    rho = 1000.0
+    a_dyn1 = L.ssm_align_sum([L.lane(+0.02), L.lane(+0.30)])
+    a_dyn2 = L.ssm_align_sum([L.lane(+0.02), L.lane(+0.20)])
+    return L.ssm_align_weighted([
+        (L.lane(+0.10), 200000.0),
+        (a_dyn1, 0.5 * rho * (1.5 ** 2)),
+        (a_dyn2, 0.5 * rho * (3.0 ** 2)),
+    ])
+
+
+def law_L08(L):
+    a_t1 = L.ssm_align_weighted([(L.lane(+0.25), 30.0), (L.lane(+0.35), 30.5)])
+    a_t2 = L.ssm_align_weighted([(L.lane(+0.20), 19.2), (L.lane(+0.12), 19.0)])
+    a_num = L.ssm_align_sum([L.lane(+0.01), a_t1])
+    return L.ssm_align_div(a_num, a_t2)
+
+
+def law_L09(L):
+    a_v1 = L.ssm_align_weighted([(L.lane(+0.45), 1.80), (L.lane(+0.20), 2.00)])
+    a_ratio = L.ssm_align_div(L.lane(+0.10), L.lane(+0.15))
+    return L.ssm_align_sum([a_ratio, a_v1])
+
+
+def law_L10(L):
+    a_dPhi = L.ssm_align_sum([L.lane(+0.60), L.lane(+0.25)])
+    a_dPhi_dt = L.ssm_align_div(a_dPhi, L.lane(+0.10))
+    return L.ssm_align_sum([L.lane(+0.02), a_dPhi_dt])
+
+
+LAWS = [
+    ("L01", law_L01), ("L02", law_L02), ("L03", law_L03), ("L04", law_L04),
+    ("L05", law_L05), ("L06", law_L06), ("L07", law_L07), ("L08", law_L08),
+    ("L09", law_L09), ("L10", law_L10),
+]
+
+
+def kernel_sweep(fx, fl, n=20000, seed=30):
+    """Max |fixed - float| for atanh over the clamped lane and tanh over |U| <= 8."""
+    rng = random.Random(seed)
+    err_atanh = 0.0
+    err_tanh = 0.0
+    for _ in range(n):
+        a = rng.uniform(-1.0, 1.0)
+        u_fx = fx.to_float(fx.atanh(fx.lane(a)))
+        err_atanh = max(err_atanh, abs(u_fx - fl.atanh(fx.to_float(fx.lane(a)))))
+        u = rng.uniform(-8.0, 8.0)
+        t_fx = fx.to_float(fx.tanh(fx.lane(u)))
+        err_tanh = max(err_tanh, abs(t_fx - math.tanh(fx.to_float(fx.lane(u)))))
+    return err_atanh, err_tanh
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fixed-point alignment lane kernel.")
+    ap.add_argument("--frac-bits", type=int, default=30)
+    ap.add_argument("--guard-bits", type=int, default=8)
+    args = ap.parse_args()
+
+    fx = FixedLane(frac_bits=args.frac_bits, guard_bits=args.guard_bits)
+    fl = FloatLane()
+    ulp = 2.0 ** -fx.F
+
+    print(f"Fixed-point lane Q{fx.F} (guard bits {fx.G}), 1 ulp = {ulp:.3e}")
+    print(f"Intermediates need {fx.intermediate_bits} bits",
+          "(fits int64)" if fx.intermediate_bits <= 63 else "(needs 128-bit)")
+    print("Law   float a     fixed a     |diff|      ulps  band")
+
+    digest = hashlib.sha256()
+    worst = 0.0
+    for law_id, law in LAWS:
+        a_fl = law(fl)
+        a_q = law(fx)
+        a_fx = fx.to_float(a_q)
+        diff = abs(a_fx - a_fl)
+        worst = max(worst, diff)
+        same = "same" if classify_band(a_fl) == classify_band(a_fx) else "DIFF"
+        print(f"{law_id}  {a_fl:+.8f} {a_fx:+.8f} {diff:.3e} {diff / ulp:6.1f}  {same}")
+        digest.update(f"{law_id}:{a_q};".encode("ascii"))
+
+    err_atanh, err_tanh = kernel_sweep(fx, fl)
+    print("Kernel sweep (max |fixed - float|):")
+    print(f"  atanh  {err_atanh:.3e}  ({err_atanh / ulp:.1f} ulps)")
+    print(f"  tanh   {err_tanh:.3e}  ({err_tanh / ulp:.1f} ulps)")
+    print(f"Worst law diff: {worst:.3e}")
+    print("Fixed results digest:", digest.hexdigest()[:16])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# lane_quantiles.py  (ASCII-only)
+# Bounded-memory, mergeable quantile sketches for the alignment lane a
+#
+# a lives in (-1, +1), so a fixed set of bins covers the whole domain and
+# every sketch has the same size no matter how many values it has seen.
+# Bins are base_step wide, refined to fine_step within +-window of the band
+# boundaries +-0.20 and +-0.50, where p50/p95/p99 decide the band. Merging
+# two sketches with the same layout is an exact element-wise count sum, so
+# shards can be combined in any order.
+#
+# Quantile error is at most the width of the bin the quantile falls in:
+#     fine_step near +-0.20 / +-0.50, base_step elsewhere.
+#
+# Input (text, comma separated, '#' lines ignored):
+#     key, a            e.g.  L07/ch3, +0.1842
+#
+# Usage:
+#     python lane_quantiles.py readings.csv [--save sk.json] [--merge a.json b.json]
+#     python lane_quantiles.py --demo 1000000        # fed from the L10 stream lane
+
+import argparse
+import json
+import math
+import os
+from array import array
+from bisect import bisect_right
+
+
+BOUNDARIES = (-0.50, -0.20, 0.20, 0.50)
+
+# bin edges per layout, built once and shared by every sketch using it
+_EDGES = {}
+
+
+def classify_band(a):
+    """Simple band policy based on |a| (same as run_all_laws.py)."""
+    x = abs(a)
+    if x < 0.20:
+        return "A+ (calm)"
+    elif x < 0.50:
+        return "A0 (borderline)"
+    else:
+        return "A- (stressed)"
+
+
+def bin_edges(base_step=0.01, fine_step=0.0005, window=0.02):
+    """Sorted bin edges over [-1, +1], refined around the band boundaries."""
+    n = int(round(2.0 / base_step))
+    edges = {round(-1.0 + 2.0 * k / n, 12) for k in range(n + 1)}
+    for b in BOUNDARIES:
+        k = int(round(2.0 * window / fine_step))
+        for j in range(k + 1):
+            edges.add(round(b - window + j * fine_step, 12))
+    return sorted(e for e in edges if -1.0 <= e <= 1.0)
+
+
+def shared_edges(layout):
+    """Cached, read-only bin edges for a (base_step, fine_step, window) layout."""
+    edges = _EDGES.get(layout)
+    if edges is None:
+        edges = _EDGES[layout] = tuple(bin_edges(*layout))
+    return edges
+
+
+class LaneSketch:
+    """
+    Fixed-size histogram sketch of alignment values.
+
+    add(a) / add_many(values) update counts; quantile(q) interpolates
+    linearly inside the bin that holds rank q*n; merge(other) adds counts.
+    Bin edges are shared between all sketches with the same layout, so the
+    per-sketch cost is the 8-byte-per-bin counts array.
+    """
+
+    def __init__(self, base_step=0.01, fine_step=0.0005, window=0.02):
+        self.layout = (float(base_step), float(fine_step), float(window))
+        self.edges = shared_edges(self.layout)
+        self.counts = array("Q", bytes(8 * (len(self.edges) - 1)))
+        self.n = 0
+        self.lo = math.inf
+        self.hi = -math.inf
+
+    def add(self, a):
+        a = float(a)
+        i = bisect_right(self.edges, a) - 1
+        last = len(self.counts) - 1
+        self.counts[0 if i < 0 else last if i > last else i] += 1
+        self.n += 1
+        if a < self.lo:
+            self.lo = a
+        if a > self.hi:
+            self.hi = a
+
+    def add_many(self, values):
+        edges = self.edges
+        counts = self.counts
+        last = len(counts) - 1
+        lo, hi = self.lo, self.hi
+        n = 0
+        for a in values:
+            i = bisect_right(edges, a) - 1
+            counts[0 if i < 0 else last if i > last else i] += 1
+            n += 1
+            if a < lo:
+                lo = a
+            if a > hi:
+                hi = a
+        self.n += n
+        self.lo, self.hi = lo, hi
+
+    def merge(self, other):
+        """Add another sketch's counts into this one (same layout required)."""
+        if other.layout != self.layout:
+            raise ValueError(f"sketch layouts differ: {self.layout} vs {other.layout}")
+        counts = self.counts
+        for i, c in enumerate(other.counts):
+            if c:
+                counts[i] += c
+        self.n += other.n
+        self.lo = min(self.lo, other.lo)
+        self.hi = max(self.hi, other.hi)
+        return self
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1); nan for an empty sketch."""
+        if self.n == 0:
+            return math.nan
+        if q <= 0.0:
+            return self.lo
+        if q >= 1.0:
+            return self.hi
+        rank = q * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                left = max(self.edges[i], self.lo)
+                right = min(self.edges[i + 1], self.hi)
+                return left + (right - left) * (rank - seen) / c
+            seen += c
+        return self.hi
+
+    def to_dict(self):
+        return {
+            "layout": list(self.layout),
+            "n": self.n,
+            "lo": self.lo if self.n else None,
+            "hi": self.hi if self.n else None,
+            "counts": {str(i): c for i, c in enumerate(self.counts) if c},
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        sk = cls(*d["layout"])
+        for i, c in d["counts"].items():
+            sk.counts[int(i)] = c
+        sk.n = d["n"]
+        if sk.n:
+            sk.lo, sk.hi = d["lo"], d["hi"]
+        return sk
+
+
+class SketchSet:
+    """LaneSketch per key (for example 'L07' or 'L07/ch3'), with one layout."""
+
+    def __init__(self, base_step=0.01, fine_step=0.0005, window=0.02):
+        self.layout = (base_step, fine_step, window)
+        self.sketches = {}
+
+    def get(self, key):
+        sk = self.sketches.get(key)
+        if sk is None:
+            sk = self.sketches[key] = LaneSketch(*self.layout)
+        return sk
+
+    def add(self, key, a):
+        self.get(key).add(a)
+
+    def merge(self, other):
+        for key, sk in other.sketches.items():
+            self.get(key).merge(sk)
+        return self
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({k: sk.to_dict() for k, sk in self.sketches.items()}, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            data = json.load(f)
+        ss = cls()
+        for key, d in data.items():
+            sk = LaneSketch.from_dict(d)
+            ss.layout = sk.layout
+            ss.sketches[key] = sk
+        return ss
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Quantile sketches of the a lane.")
+    ap.add_argument("path", nargs="?", help="readings: key, a")
+    ap.add_argument("--save", help="write the sketches to this JSON file")
+    ap.add_argument("--merge", nargs="*", default=[], help="sketch files to merge in")
+    ap.add_argument("--base-step", type=float, default=0.01)
+    ap.add_argument("--fine-step", type=float, default=0.0005)
+    ap.add_argument("--window", type=float, default=0.02)
+    ap.add_argument("--demo", type=int, default=0,
+                    help="sketch a_eps from N synthetic L10 stream samples")
+    args = ap.parse_args()
+
+    ss = SketchSet(args.base_step, args.fine_step, args.window)
+
+    if args.demo > 0:
+        from stream_L10_faraday_emf import FaradayStream, synthetic_flux_chunks
+        stream = FaradayStream()
+        sk = ss.get("L10")
+        for chunk in synthetic_flux_chunks(args.demo):
+            sk.add_many(stream.process(*chunk)[3])
+    elif args.path:
+        with open(args.path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                key, a_s = line.rsplit(",", 1)
+                ss.add(key.strip(), float(a_s))
+
+    for path in args.merge:
+        ss.merge(SketchSet.load(path))
+
+    if args.save:
+        ss.save(args.save)
+
+    # the band column reads the stressed tail on either side of zero:
+    # |a| of the 5% / 95% quantiles, whichever is larger
+    print("key              n           p50      p95      p99    band (tail |a|)")
+    for key in sorted(ss.sketches):
+        sk = ss.sketches[key]
+        p05, p50, p95, p99 = (sk.quantile(q) for q in (0.05, 0.50, 0.95, 0.99))
+        tail = max(abs(p05), abs(p95))
+        print(f"{key:14s} {sk.n:>10d}  {p50:+.4f}  {p95:+.4f}  {p99:+.4f}  {classify_band(tail)}")
+
+
+if __name__ == "__main__":
+    main()
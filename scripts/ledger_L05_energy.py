@@ -0,0 +1,383 @@
+# ledger_L05_energy.py  (ASCII-only)
+# Law L05: incremental multi-device energy ledger
+# Classical: E_in = E_out + E_loss  ->  E_loss = E_in - E_out
+#
+# Each interval record adds one E_in = V * I * t slice and one E_out slice
+# for a device. Running totals and the pooled lanes are kept as rapidity
+# sums (U, W), so every ingest and every query is O(1) and history is never
+# rescanned. The ledger can be checkpointed to disk and restored.
+#
+# A checkpoint also stores an ingest watermark per record file: the byte
+# offset after the last applied record plus the file's identity (device,
+# inode and a digest of the bytes already read). A restarted run checks the
+# identity and seek()s straight to the offset, so restart cost does not grow
+# with history and a record is never counted twice; a rotated or rewritten
+# file is refused instead of silently losing its first records. With
+# --checkpoint-every N a crash loses at most the last N records.
+#
+# Record file (text, comma separated, '#' lines ignored):
+#     device, V_m, V_a, I_m, I_a, t_m, t_a, E_out_m, E_out_a
+#
+# Usage:
+#     python ledger_L05_energy.py records.csv [--checkpoint ledger.json]
+#         [--checkpoint-every 100000]
+#     python ledger_L05_energy.py --demo 200000 --devices 5000
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import time
+
+from result_store import add_store_option, store_results
+
+
+def clamp(a, e=1e-6):
+    return max(-1 + e, min(1 - e, float(a)))
+
+
+def atanh_c(a_raw, eps=1e-6):
+    """atanh(clamp_a(a)) written as 0.5 * ln((1+a)/(1-a))."""
+    a = clamp(a_raw, eps)
+    return 0.5 * math.log((1.0 + a) / (1.0 - a))
+
+
+def ssm_align_sum(a_list, eps=1e-6):
+    """
+    Sum of hyperbolic rapidities for multiple lanes:
+    a_out := tanh(atanh(a1_c) + atanh(a2_c) + ...)
+    """
+    U = 0.0
+    for a_raw in a_list:
+        a = clamp(a_raw, eps)
+        U += 0.5 * math.log((1.0 + a) / (1.0 - a))
+    return math.tanh(U)
+
+
+def classify_band(a):
+    """Simple band policy based on |a| (same as run_all_laws.py)."""
+    x = abs(a)
+    if x < 0.20:
+        return "A+ (calm)"
+    elif x < 0.50:
+        return "A0 (borderline)"
+    else:
+        return "A- (stressed)"
+
+
+BANDS = ("A+ (calm)", "A0 (borderline)", "A- (stressed)")
+
+# file identity digest covers at most this many leading bytes
+HEAD_BYTES = 4096
+
+# per-device slot layout: [E_in, U_in, W_in, E_out, U_out, W_out, records]
+E_IN, U_IN, W_IN, E_OUT, U_OUT, W_OUT, N_REC = range(7)
+
+
+class EnergyLedger:
+    """
+    Running energy balance per device and for the whole fleet.
+
+    Pooled lanes follow the weighted rule with w := |E_slice|:
+        a_Ein   := tanh(U_in / max(W_in, eps_w))
+        a_Eout  := tanh(U_out / max(W_out, eps_w))
+        a_Eloss := tanh(atanh(a_Ein_c) + atanh(a_Eout_c))     (as in L05)
+    """
+
+    def __init__(self, eps_w=1e-12):
+        self.eps_w = eps_w
+        self.devices = {}
+        self.bands = {}
+        self.fleet = [0.0] * 7
+        self.band_counts = dict.fromkeys(BANDS, 0)
+        self.watermarks = {}
+
+    def ingest(self, device, V_m, V_a, I_m, I_a, t_m, t_a, E_out_m, E_out_a):
+        """Add one interval record for a device."""
+        E_in_m = V_m * I_m * t_m
+        u_in = atanh_c(V_a) + atanh_c(I_a) + atanh_c(t_a)
+        # clamp the product lane before pooling, as ssm_align_sum would
+        u_in = atanh_c(math.tanh(u_in))
+        u_out = atanh_c(E_out_a)
+        w_in = abs(E_in_m)
+        w_out = abs(E_out_m)
+
+        slot = self.devices.get(device)
+        if slot is None:
+            slot = self.devices[device] = [0.0] * 7
+        for acc in (slot, self.fleet):
+            acc[E_IN] += E_in_m
+            acc[U_IN] += w_in * u_in
+            acc[W_IN] += w_in
+            acc[E_OUT] += E_out_m
+            acc[U_OUT] += w_out * u_out
+            acc[W_OUT] += w_out
+            acc[N_REC] += 1
+
+        band = classify_band(self._lanes(slot)[2])
+        old = self.bands.get(device)
+        if old != band:
+            if old is not None:
+                self.band_counts[old] -= 1
+            self.band_counts[band] += 1
+            self.bands[device] = band
+
+    def ingest_source(self, source, records, checkpoint=None, every=0):
+        """
+        Ingest records from a named, regenerable source (e.g. the demo
+        generator), resuming after its watermark.
+
+        The first watermarks[source] records were applied by an earlier run
+        and are skipped. With a checkpoint path and every > 0, the ledger is
+        saved after every `every` new records. Returns the number applied.
+        Record files should go through ingest_file(), which seeks instead.
+        """
+        done = self.watermarks.get(source, 0)
+        n = 0
+        for rec in itertools.islice(records, done, None):
+            self.ingest(*rec)
+            n += 1
+            if every > 0 and checkpoint and n % every == 0:
+                self.watermarks[source] = done + n
+                self.save(checkpoint)
+        self.watermarks[source] = done + n
+        return n
+
+    def ingest_file(self, path, checkpoint=None, every=0):
+        """
+        Ingest a record file, resuming at the byte offset of its watermark.
+
+        Raises ValueError if the file is not the one the watermark was taken
+        from (other device/inode, shorter than the offset, or different
+        leading bytes). Checkpointing as in ingest_source().
+        """
+        source = os.path.abspath(path)
+        mark = self.watermarks.get(source)
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            offset = 0
+            done = 0
+            if isinstance(mark, int):
+                # version 2 checkpoint: record count only, skip by parsing once
+                done = mark
+                for line in f:
+                    offset += len(line)
+                    if parse_record(line) is not None:
+                        mark -= 1
+                        if mark == 0:
+                            break
+            elif mark is not None:
+                offset, done = mark["offset"], mark["records"]
+                if ((st.st_dev, st.st_ino) != (mark["dev"], mark["ino"])
+                        or st.st_size < offset
+                        or file_head_digest(path, offset) != mark["head"]):
+                    raise ValueError(
+                        f"{path} changed since the checkpoint (rotated or rewritten); "
+                        "refusing to resume at its watermark"
+                    )
+                f.seek(offset)
+
+            n = 0
+            for line in f:
+                offset += len(line)
+                rec = parse_record(line)
+                if rec is None:
+                    continue
+                self.ingest(*rec)
+                n += 1
+                if every > 0 and checkpoint and n % every == 0:
+                    self.watermarks[source] = file_mark(path, st, offset, done + n)
+                    self.save(checkpoint)
+        self.watermarks[source] = file_mark(path, st, offset, done + n)
+        return n
+
+    def _lanes(self, slot):
+        a_Ein = math.tanh(slot[U_IN] / max(slot[W_IN], self.eps_w))
+        a_Eout = math.tanh(slot[U_OUT] / max(slot[W_OUT], self.eps_w))
+        a_Eloss = ssm_align_sum([a_Ein, a_Eout])
+        return a_Ein, a_Eout, a_Eloss
+
+    def _report(self, slot):
+        a_Ein, a_Eout, a_Eloss = self._lanes(slot)
+        return {
+            "E_in": (slot[E_IN], a_Ein),
+            "E_out": (slot[E_OUT], a_Eout),
+            "E_loss": (slot[E_IN] - slot[E_OUT], a_Eloss),
+            "band": classify_band(a_Eloss),
+            "records": int(slot[N_REC]),
+        }
+
+    def device(self, device):
+        """Per-device (m, a) for E_in, E_out, E_loss plus band; None if unseen."""
+        slot = self.devices.get(device)
+        return None if slot is None else self._report(slot)
+
+    def fleet_report(self):
+        """Fleet-wide (m, a) for E_in, E_out, E_loss plus per-band device counts."""
+        report = self._report(self.fleet)
+        report["devices"] = len(self.devices)
+        report["band_counts"] = dict(self.band_counts)
+        return report
+
+    def save(self, path):
+        """Write a checkpoint atomically (tmp file + rename)."""
+        state = {
+            "version": 3,
+            "eps_w": self.eps_w,
+            "fleet": self.fleet,
+            "devices": self.devices,
+            "watermarks": self.watermarks,
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Restore a ledger from a checkpoint written by save()."""
+        with open(path, "r") as f:
+            state = json.load(f)
+        if state.get("version") not in (1, 2, 3):
+            raise ValueError(f"unsupported ledger checkpoint: {path}")
+        ledger = cls(eps_w=state["eps_w"])
+        ledger.fleet = state["fleet"]
+        ledger.devices = state["devices"]
+        ledger.watermarks = state.get("watermarks", {})
+        for device, slot in ledger.devices.items():
+            band = classify_band(ledger._lanes(slot)[2])
+            ledger.bands[device] = band
+            ledger.band_counts[band] += 1
+        return ledger
+
+
+def parse_record(line):
+    """
+    One record line (str or bytes) -> (device, V_m, V_a, I_m, I_a, t_m, t_a,
+    E_out_m, E_out_a), or None for blank and '#' lines.
+    """
+    if isinstance(line, bytes):
+        line = line.decode("utf-8")
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    parts = [p.strip() for p in line.split(",")]
+    return (parts[0],) + tuple(float(p) for p in parts[1:9])
+
+
+def read_records(path):
+    """Yield (device, V_m, V_a, I_m, I_a, t_m, t_a, E_out_m, E_out_a) tuples."""
+    with open(path, "r") as f:
+        for line in f:
+            rec = parse_record(line)
+            if rec is not None:
+                yield rec
+
+
+def file_head_digest(path, offset):
+    """sha256 (hex) of the first min(offset, HEAD_BYTES) bytes of a file."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read(min(offset, HEAD_BYTES))).hexdigest()
+
+
+def file_mark(path, st, offset, records):
+    """Watermark for a record file: resume offset plus identity."""
+    return {
+        "offset": offset,
+        "records": records,
+        "dev": st.st_dev,
+        "ino": st.st_ino,
+        "head": file_head_digest(path, offset),
+    }
+
+
+def synthetic_records(n_records, n_devices, seed=5):
+    """Interval records in the spirit of scenario_L05 spread over a fleet."""
+    rng = random.Random(seed)
+    for _ in range(n_records):
+        k = rng.randrange(n_devices)
+        yield (
+            f"dev{k:05d}",
+            12.0, +0.10,
+            rng.uniform(1.5, 1.9), rng.uniform(0.05, 0.70),
+            3.0, +0.05,
+            rng.uniform(8.0, 12.0), rng.uniform(0.05, 0.15),
+        )
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Incremental energy ledger (L05).")
+    ap.add_argument("path", nargs="?", help="record file to ingest")
+    ap.add_argument("--checkpoint", help="load from / save to this JSON file")
+    ap.add_argument("--checkpoint-every", type=int, default=0, metavar="N",
+                    help="also save the checkpoint after every N ingested records")
+    ap.add_argument("--device", help="print the report for one device")
+    ap.add_argument("--demo", type=int, default=0,
+                    help="ingest N synthetic records instead of a file")
+    ap.add_argument("--devices", type=int, default=1000,
+                    help="fleet size in --demo mode")
+    add_store_option(ap)
+    args = ap.parse_args()
+
+    if args.checkpoint and os.path.exists(args.checkpoint):
+        ledger = EnergyLedger.load(args.checkpoint)
+    else:
+        ledger = EnergyLedger()
+
+    t0 = time.perf_counter()
+    n = 0
+    if args.demo > 0:
+        source = f"<demo devices={args.devices}>"
+        skipped = ledger.watermarks.get(source, 0)
+        records = synthetic_records(args.demo, args.devices)
+        n = ledger.ingest_source(source, records, args.checkpoint, args.checkpoint_every)
+    elif args.path:
+        source = os.path.abspath(args.path)
+        mark = ledger.watermarks.get(source, 0)
+        skipped = mark if isinstance(mark, int) else mark["records"]
+        try:
+            n = ledger.ingest_file(args.path, args.checkpoint, args.checkpoint_every)
+        except ValueError as e:
+            raise SystemExit(f"[ledger] {e}")
+    else:
+        source, skipped = None, 0
+    if skipped:
+        print(f"[ledger] resumed {source} after {skipped} records already in the checkpoint")
+    elapsed = time.perf_counter() - t0
+
+    if args.checkpoint:
+        ledger.save(args.checkpoint)
+
+    rep = ledger.fleet_report()
+    E_loss_m, a_Eloss = rep["E_loss"]
+
+    print("Classical (fleet):")
+    print("  devices =", rep["devices"], " records =", rep["records"])
+    print("  E_in    =", f"{rep['E_in'][0]:.2f}", "J")
+    print("  E_out   =", f"{rep['E_out'][0]:.2f}", "J")
+    print("  E_loss  =", f"{E_loss_m:.2f}", "J")
+
+    print("SSM (fleet loss lane):")
+    print("  E_loss =", f"m={E_loss_m:.2f}, a={a_Eloss:+.4f}")
+    for band in BANDS:
+        print(f"  {band:16s} {rep['band_counts'][band]} devices")
+    if n:
+        print("  ingested", n, "records at", f"{n / max(elapsed, 1e-9):,.0f}", "records/s")
+
+    if args.device:
+        dev = ledger.device(args.device)
+        if dev is None:
+            print("[ledger] unknown device:", args.device)
+        else:
+            m, a = dev["E_loss"]
+            print(f"  {args.device}: E_loss m={m:.2f}, a={a:+.4f} [{dev['band']}]")
+
+    print("SSM:", f"m={E_loss_m:.2f}, a={a_Eloss:+.4f}")
+    store_results(args, [("L05", E_loss_m, a_Eloss)])
+
+
+if __name__ == "__main__":
+    main()
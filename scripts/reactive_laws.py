@@ -0,0 +1,398 @@
+# reactive_laws.py  (ASCII-only)
+# Reactive incremental recomputation of law lanes (L01..L10)
+#
+# Each law is kept as a dependency graph of its magnitude and lane nodes
+# (for L04: T_avg, P_m, a_T, a_nRT, a_P ...), exactly as the scenario scripts
+# compute them. Changing one input re-evaluates only the nodes downstream of
+# it, in topological order, and stops early where a recomputed value did not
+# change. Update cost is proportional to the affected part of the graph,
+# not to the number of laws or inputs in the model.
+#
+# Usage:
+#     python reactive_laws.py                   # L01..L10 at scenario inputs
+#     python reactive_laws.py --demo 500 --updates 20000
+#         (500 copies of each law, 20000 single-input updates)
+
+import argparse
+import heapq
+import math
+import random
+import time
+
+
+def clamp(a, e=1e-6):
+    return max(-1 + e, min(1 - e, float(a)))
+
+
+def classify_band(a):
+    """Simple band policy based on |a| (same as run_all_laws.py)."""
+    x = abs(a)
+    if x < 0.20:
+        return "A+ (calm)"
+    elif x < 0.50:
+        return "A0 (borderline)"
+    else:
+        return "A- (stressed)"
+
+
+def ssm_align_weighted(pairs, gamma=1.0, eps=1e-12):
+    """
+    pairs: iterable of (a_raw, m)
+    weight w := |m|^gamma
+    """
+    U = 0.0
+    W = 0.0
+    for a_raw, m in pairs:
+        a = clamp(a_raw)
+        # atanh(a) = 0.5 * ln((1+a)/(1-a))
+        u = 0.5 * math.log((1.0 + a) / (1.0 - a))
+        w = abs(float(m)) ** gamma
+        U += w * u
+        W += w
+    return math.tanh(U / max(W, eps))
+
+
+def ssm_align_sum(a_list, eps=1e-6):
+    """
+    Sum of hyperbolic rapidities:
+    a_out := tanh(atanh(a1_c) + atanh(a2_c) + ...)
+    """
+    U = 0.0
+    for a_raw in a_list:
+        a = clamp(a_raw, eps)
+        U += 0.5 * math.log((1.0 + a) / (1.0 - a))
+    return math.tanh(U)
+
+
+def ssm_align_product(a1_raw, a2_raw, eps=1e-6):
+    """
+    Product chaining for alignment lane:
+    a_out := tanh(atanh(a1_c) + atanh(a2_c))
+    """
+    return ssm_align_sum([a1_raw, a2_raw], eps)
+
+
+def ssm_align_div(a_num_raw, a_den_raw, eps=1e-6):
+    """
+    Division for alignment lane:
+    a_out := tanh(atanh(a_num_c) - atanh(a_den_c))
+    """
+    a_num = clamp(a_num_raw, eps)
+    a_den = clamp(a_den_raw, eps)
+    u_num = 0.5 * math.log((1.0 + a_num) / (1.0 - a_num))
+    u_den = 0.5 * math.log((1.0 + a_den) / (1.0 - a_den))
+    return math.tanh(u_num - u_den)
+
+
+# flat-argument adapters for graph nodes
+def pool(*args):
+    """pool(a1, m1, a2, m2, ...) -> ssm_align_weighted with gamma = 1."""
+    return ssm_align_weighted(zip(args[0::2], args[1::2]), gamma=1.0, eps=1e-12)
+
+
+def lane_sum(*lanes):
+    return ssm_align_sum(lanes)
+
+
+class ReactiveGraph:
+    """
+    Nodes are created in dependency order (parents first), so node ids are
+    already a topological order. set() pushes changes to children through a
+    min-heap of ids, so each affected node is evaluated once, after all of
+    its changed parents.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+        self.fns = []
+        self.parents = []
+        self.children = []
+        self.values = []
+        self.evaluations = 0
+
+    def _add(self, name, fn, parent_ids, value):
+        if name in self.ids:
+            raise ValueError(f"duplicate node: {name}")
+        i = len(self.values)
+        self.ids[name] = i
+        self.names.append(name)
+        self.fns.append(fn)
+        self.parents.append(parent_ids)
+        self.children.append([])
+        self.values.append(value)
+        for p in parent_ids:
+            self.children[p].append(i)
+        return i
+
+    def input(self, name, value):
+        return self._add(name, None, (), float(value))
+
+    def node(self, name, fn, *parent_names):
+        parent_ids = tuple(self.ids[p] for p in parent_names)
+        value = fn(*(self.values[p] for p in parent_ids))
+        return self._add(name, fn, parent_ids, value)
+
+    def scope(self, prefix):
+        return Scope(self, prefix)
+
+    def get(self, name):
+        return self.values[self.ids[name]]
+
+    def set(self, name, value):
+        """Change one input; return the number of nodes re-evaluated."""
+        return self.set_many({name: value})
+
+    def set_many(self, updates):
+        """Change several inputs at once; return the number of nodes re-evaluated."""
+        values = self.values
+        heap = []
+        queued = set()
+        for name, value in updates.items():
+            i = self.ids[name]
+            if self.fns[i] is not None:
+                raise ValueError(f"not an input: {name}")
+            value = float(value)
+            if values[i] == value:
+                continue
+            values[i] = value
+            for c in self.children[i]:
+                if c not in queued:
+                    queued.add(c)
+                    heapq.heappush(heap, c)
+
+        n = 0
+        fns = self.fns
+        parents = self.parents
+        children = self.children
+        while heap:
+            i = heapq.heappop(heap)
+            new = fns[i](*[values[p] for p in parents[i]])
+            n += 1
+            if new == values[i]:
+                continue   # early cutoff: nothing below can change
+            values[i] = new
+            for c in children[i]:
+                if c not in queued:
+                    queued.add(c)
+                    heapq.heappush(heap, c)
+        self.evaluations += n
+        return n
+
+
+class Scope:
+    """Name prefix helper: scope.node('a_P', fn, 'a_nRT', 'V_a') -> 'L04.a_P'."""
+
+    def __init__(self, graph, prefix):
+        self.graph = graph
+        self.prefix = prefix
+
+    def name(self, local):
+        return f"{self.prefix}.{local}"
+
+    def input(self, local, value):
+        return self.graph.input(self.name(local), value)
+
+    def inputs(self, **values):
+        for local, value in values.items():
+            self.input(local, value)
+
+    def node(self, local, fn, *parents):
+        return self.graph.node(self.name(local), fn, *(self.name(p) for p in parents))
+
+
+# -- law graphs: same inputs and lane chains as scenario_L01..L10 -----------
+# Each builder returns the (m, a) output node names.
+
+def build_L01(g, prefix="L01"):
+    s = g.scope(prefix)
+    s.inputs(I1_m=1.92, I1_a=+0.72, I2_m=1.98, I2_a=+0.05, R_m=6.10, R_a=+0.10)
+    s.node("I_avg", lambda a, b: 0.5 * (a + b), "I1_m", "I2_m")
+    s.node("V_m", lambda i, r: i * r, "I_avg", "R_m")
+    s.node("a_I", pool, "I1_a", "I1_m", "I2_a", "I2_m")
+    s.node("a_V", ssm_align_product, "a_I", "R_a")
+    return s.name("V_m"), s.name("a_V")
+
+
+def build_L02(g, prefix="L02"):
+    s = g.scope(prefix)
+    s.inputs(m_m=20.0, m_a=+0.05, a1_m=0.90, a1_a=+0.65, a2_m=1.10, a2_a=+0.10)
+    s.node("a_avg", lambda a, b: 0.5 * (a + b), "a1_m", "a2_m")
+    s.node("F_m", lambda m, a: m * a, "m_m", "a_avg")
+    s.node("a_accel", pool, "a1_a", "a1_m", "a2_a", "a2_m")
+    s.node("a_F", ssm_align_product, "m_a", "a_accel")
+    return s.name("F_m"), s.name("a_F")
+
+
+def build_L03(g, prefix="L03"):
+    s = g.scope(prefix)
+    s.inputs(k_m=200.0, k_a=+0.08, x1_m=0.045, x1_a=+0.60, x2_m=0.055, x2_a=+0.10)
+    s.node("x_avg", lambda a, b: 0.5 * (a + b), "x1_m", "x2_m")
+    s.node("F_m", lambda k, x: k * x, "k_m", "x_avg")
+    s.node("a_x", pool, "x1_a", "x1_m", "x2_a", "x2_m")
+    s.node("a_F", ssm_align_product, "k_a", "a_x")
+    return s.name("F_m"), s.name("a_F")
+
+
+def build_L04(g, prefix="L04"):
+    s = g.scope(prefix)
+    s.inputs(n_m=1.00, n_a=+0.02, R_m=8.314, R_a=+0.00, V_m=0.0100, V_a=+0.10,
+             T1_m=295.0, T1_a=+0.55, T2_m=305.0, T2_a=+0.12)
+    s.node("T_avg", lambda a, b: 0.5 * (a + b), "T1_m", "T2_m")
+    s.node("P_m", lambda n, r, t, v: (n * r * t) / v, "n_m", "R_m", "T_avg", "V_m")
+    s.node("a_T", pool, "T1_a", "T1_m", "T2_a", "T2_m")
+    s.node("a_nRT", lane_sum, "n_a", "R_a", "a_T")
+    s.node("a_P", ssm_align_div, "a_nRT", "V_a")
+    return s.name("P_m"), s.name("a_P")
+
+
+def build_L05(g, prefix="L05"):
+    s = g.scope(prefix)
+    s.inputs(V_m=12.0, V_a=+0.10, I1_m=1.80, I1_a=+0.70, I2_m=1.60, I2_a=+0.15,
+             t_m=3.0, t_a=+0.05, m_load_m=2.0, m_load_a=+0.05, h_m=0.50, h_a=+0.10,
+             g_m=9.81, g_a=0.0)
+    s.node("I_avg_m", lambda a, b: 0.5 * (a + b), "I1_m", "I2_m")
+    s.node("E_in_m", lambda v, i, t: v * i * t, "V_m", "I_avg_m", "t_m")
+    s.node("E_out_m", lambda m, gg, h: m * gg * h, "m_load_m", "g_m", "h_m")
+    s.node("E_loss_m", lambda a, b: a - b, "E_in_m", "E_out_m")
+    s.node("a_I", pool, "I1_a", "I1_m", "I2_a", "I2_m")
+    s.node("a_Ein", lane_sum, "V_a", "a_I", "t_a")
+    s.node("a_Eout", lane_sum, "m_load_a", "g_a", "h_a")
+    s.node("a_Eloss", lane_sum, "a_Ein", "a_Eout")
+    return s.name("E_loss_m"), s.name("a_Eloss")
+
+
+def build_L06(g, prefix="L06"):
+    s = g.scope(prefix)
+    s.inputs(m1_m=1.50, m1_a=+0.05, m2_m=1.00, m2_a=+0.05,
+             u1_m=1.20, u1_a=+0.40, u2_m=0.00, u2_a=+0.05,
+             v1_m=0.70, v1_a=+0.35, v2_m=0.80, v2_a=+0.20)
+    mul = lambda a, b: a * b
+    s.node("p1_before", mul, "m1_m", "u1_m")
+    s.node("p2_before", mul, "m2_m", "u2_m")
+    s.node("p1_after", mul, "m1_m", "v1_m")
+    s.node("p2_after", mul, "m2_m", "v2_m")
+    s.node("p_before_m", lambda a, b: a + b, "p1_before", "p2_before")
+    s.node("p_after_m", lambda a, b: a + b, "p1_after", "p2_after")
+    s.node("delta_p_m", lambda a, b: a - b, "p_before_m", "p_after_m")
+    s.node("a_p1_before", lane_sum, "m1_a", "u1_a")
+    s.node("a_p2_before", lane_sum, "m2_a", "u2_a")
+    s.node("a_p1_after", lane_sum, "m1_a", "v1_a")
+    s.node("a_p2_after", lane_sum, "m2_a", "v2_a")
+    s.node("a_before", pool, "a_p1_before", "p1_before", "a_p2_before", "p2_before")
+    s.node("a_after", pool, "a_p1_after", "p1_after", "a_p2_after", "p2_after")
+    s.node("a_delta_p", lane_sum, "a_before", "a_after")
+    return s.name("delta_p_m"), s.name("a_delta_p")
+
+
+def build_L07(g, prefix="L07"):
+    s = g.scope(prefix)
+    s.inputs(rho_m=1000.0, rho_a=+0.02, P1_m=200000.0, P1_a=+0.10,
+             v1_m=1.5, v1_a=+0.30, v2_m=3.0, v2_a=+0.20)
+    s.node("P2_m", lambda p, r, a, b: p + 0.5 * r * (a ** 2 - b ** 2),
+           "P1_m", "rho_m", "v1_m", "v2_m")
+    s.node("a_dyn1", lane_sum, "rho_a", "v1_a")
+    s.node("a_dyn2", lane_sum, "rho_a", "v2_a")
+    s.node("dyn1_m", lambda r, v: 0.5 * r * (v ** 2), "rho_m", "v1_m")
+    s.node("dyn2_m", lambda r, v: 0.5 * r * (v ** 2), "rho_m", "v2_m")
+    s.node("a_P2", pool, "P1_a", "P1_m", "a_dyn1", "dyn1_m", "a_dyn2", "dyn2_m")
+    return s.name("P2_m"), s.name("a_P2")
+
+
+def build_L08(g, prefix="L08"):
+    s = g.scope(prefix)
+    s.inputs(n1_m=1.000, n1_a=+0.01,
+             theta1_1_m=30.0, theta1_1_a=+0.25, theta1_2_m=30.5, theta1_2_a=+0.35,
+             theta2_1_m=19.2, theta2_1_a=+0.20, theta2_2_m=19.0, theta2_2_a=+0.12)
+    s.node("theta1_avg", lambda a, b: 0.5 * (a + b), "theta1_1_m", "theta1_2_m")
+    s.node("theta2_avg", lambda a, b: 0.5 * (a + b), "theta2_1_m", "theta2_2_m")
+    s.node("n2_m",
+           lambda n1, t1, t2: n1 * math.sin(math.radians(t1)) / math.sin(math.radians(t2)),
+           "n1_m", "theta1_avg", "theta2_avg")
+    s.node("a_theta1", pool, "theta1_1_a", "theta1_1_m", "theta1_2_a", "theta1_2_m")
+    s.node("a_theta2", pool, "theta2_1_a", "theta2_1_m", "theta2_2_a", "theta2_2_m")
+    s.node("a_num", lane_sum, "n1_a", "a_theta1")
+    s.node("a_n2", ssm_align_div, "a_num", "a_theta2")
+    return s.name("n2_m"), s.name("a_n2")
+
+
+def build_L09(g, prefix="L09"):
+    s = g.scope(prefix)
+    s.inputs(A1_m=0.0100, A1_a=+0.10, A2_m=0.0060, A2_a=+0.15,
+             v1_1_m=1.80, v1_1_a=+0.45, v1_2_m=2.00, v1_2_a=+0.20)
+    s.node("v1_avg_m", lambda a, b: 0.5 * (a + b), "v1_1_m", "v1_2_m")
+    s.node("v2_m", lambda a1, a2, v: (a1 / a2) * v, "A1_m", "A2_m", "v1_avg_m")
+    s.node("a_v1", pool, "v1_1_a", "v1_1_m", "v1_2_a", "v1_2_m")
+    s.node("a_ratio", ssm_align_div, "A1_a", "A2_a")
+    s.node("a_v2", lane_sum, "a_ratio", "a_v1")
+    return s.name("v2_m"), s.name("a_v2")
+
+
+def build_L10(g, prefix="L10"):
+    s = g.scope(prefix)
+    s.inputs(N_m=200, N_a=+0.02, Phi1_m=0.012, Phi1_a=+0.60,
+             Phi2_m=0.004, Phi2_a=+0.25, dt_m=0.040, dt_a=+0.10)
+    s.node("dPhi_dt_m", lambda p1, p2, dt: (p2 - p1) / dt, "Phi1_m", "Phi2_m", "dt_m")
+    s.node("eps_mag_m", lambda n, d: n * abs(d), "N_m", "dPhi_dt_m")
+    s.node("a_dPhi", lane_sum, "Phi1_a", "Phi2_a")
+    s.node("a_dPhi_dt", ssm_align_div, "a_dPhi", "dt_a")
+    s.node("a_eps", lane_sum, "N_a", "a_dPhi_dt")
+    return s.name("eps_mag_m"), s.name("a_eps")
+
+
+BUILDERS = [
+    build_L01, build_L02, build_L03, build_L04, build_L05,
+    build_L06, build_L07, build_L08, build_L09, build_L10,
+]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Reactive law lane graphs.")
+    ap.add_argument("--demo", type=int, default=0,
+                    help="build N copies of each law and apply random updates")
+    ap.add_argument("--updates", type=int, default=10000)
+    args = ap.parse_args()
+
+    if args.demo <= 0:
+        g = ReactiveGraph()
+        outputs = [build(g) for build in BUILDERS]
+        for m_name, a_name in outputs:
+            m_val, a_val = g.get(m_name), g.get(a_name)
+            print(f"{a_name.split('.')[0]}  m={m_val:.4f}, a={a_val:+.4f} [{classify_band(a_val)}]")
+
+        n = g.set("L04.T2_m", 310.0)
+        print("set L04.T2_m = 310.0 ->", n, "nodes re-evaluated")
+        n = g.set("L07.v1_a", +0.45)
+        print("set L07.v1_a = +0.45 ->", n, "nodes re-evaluated")
+        print("L04", f"a={g.get('L04.a_P'):+.4f}", " L07", f"a={g.get('L07.a_P2'):+.4f}")
+        return
+
+    g = ReactiveGraph()
+    for k in range(args.demo):
+        for build in BUILDERS:
+            build(g, f"{build.__name__[6:]}#{k}")
+    inputs = [name for name, i in g.ids.items() if g.fns[i] is None]
+
+    rng = random.Random(37)
+    t0 = time.perf_counter()
+    touched = 0
+    for _ in range(args.updates):
+        name = rng.choice(inputs)
+        old = g.get(name)
+        if name.endswith("_a"):
+            new = max(-0.95, min(0.95, old + rng.uniform(-0.05, 0.05)))
+        else:
+            new = old * (1.0 + rng.uniform(-0.02, 0.02))
+        touched += g.set(name, new)
+    elapsed = time.perf_counter() - t0
+
+    print("nodes            =", len(g.values))
+    print("inputs           =", len(inputs))
+    print("updates          =", args.updates)
+    print("nodes per update =", f"{touched / args.updates:.2f}",
+          f"(vs {len(g.values) - len(inputs)} for a full recompute)")
+    print("time per update  =", f"{1e6 * elapsed / args.updates:.1f}", "us")
+
+
+if __name__ == "__main__":
+    main()
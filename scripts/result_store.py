@@ -0,0 +1,391 @@
+# result_store.py  (ASCII-only)
+# Append-only binary result log with a sidecar index by law, band and time
+#
+# Layout of a store directory:
+#     results.log             fixed 48-byte records, append-only
+#     index/<law>.<band>.idx  16-byte entries (t_us, record_no), time-ordered
+#     index/meta              number of log records already indexed
+#
+# Record (little-endian): law id (4s), t_us (q), m (d), a (d), band (B),
+# input digest (16s), padding (3x).
+#
+# A query such as "L07 in A- over the last 30 days" is a binary search in
+# index/L07.A-.idx followed by a sequential read of the matching entries;
+# the log itself is never scanned.
+#
+# Crash recovery on open: a partial trailing record is cut off the log (and
+# a partial entry off each index), then log records not yet indexed are
+# indexed; entries that reached an index before the meta update are
+# recognised by record number and not added twice. append_many() writes a
+# whole batch with one write per file and a single meta update.
+#
+# Writers serialise on an exclusive lock of results.log (flock; byte-range
+# lock on Windows) and take record numbers from the log length under that
+# lock, so several processes can append to one store.
+#
+# Usage:
+#     python result_store.py STORE_DIR [--law L07] [--band A-] [--since-days 30]
+#     python run_all_laws.py --store STORE_DIR       # record runner results
+#     python stream_L10_faraday_emf.py flux.csv --store STORE_DIR   # and batch tools
+
+import argparse
+import contextlib
+import datetime
+import hashlib
+import os
+import struct
+import time
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+
+RECORD = struct.Struct("<4sqddB16s3x")
+ENTRY = struct.Struct("<qQ")
+
+BAND_CODES = ("A+", "A0", "A-")
+
+
+def classify_band(a):
+    """Simple band policy based on |a| (same as run_all_laws.py)."""
+    x = abs(a)
+    if x < 0.20:
+        return "A+ (calm)"
+    elif x < 0.50:
+        return "A0 (borderline)"
+    else:
+        return "A- (stressed)"
+
+
+def band_code(a):
+    """Short band label used in index file names: A+, A0 or A-."""
+    return classify_band(a)[:2]
+
+
+@contextlib.contextmanager
+def _exclusive(f):
+    """Hold an exclusive lock on an open file for the duration of the block."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def input_digest(data):
+    """16-byte digest of a scenario's inputs (bytes or str)."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).digest()[:16]
+
+
+def add_store_option(ap):
+    """Add the shared --store DIR option to a batch tool's argument parser."""
+    ap.add_argument("--store", metavar="DIR",
+                    help="append the final SSM (m, a) to this result store")
+
+
+def store_results(args, results):
+    """
+    Append a batch tool's final [(law, m, a), ...] to args.store in one
+    append_many call (no-op without --store). The input digest covers the
+    tool's other arguments, so runs over different inputs can be told apart.
+    """
+    if not getattr(args, "store", None):
+        return range(0)
+    opts = sorted((k, v) for k, v in vars(args).items() if k != "store")
+    digest = input_digest(repr(opts))
+    store = ResultStore(args.store)
+    return store.append_many((law, m, a, digest, None) for law, m, a in results)
+
+
+class ResultStore:
+    """
+    Append-only (law, t, m, a, band, digest) records with per-(law, band)
+    time indexes. Appends must be time-ordered within each (law, band).
+    Several writers (processes or instances) may share one directory:
+    every write holds an exclusive lock on the log. rebuild=True drops and
+    rebuilds the index on open (the remedy when the index is unusable).
+    """
+
+    def __init__(self, path, rebuild=False):
+        self.path = path
+        self.index_dir = os.path.join(path, "index")
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.log_path = os.path.join(path, "results.log")
+        self.meta_path = os.path.join(self.index_dir, "meta")
+        self._last = {}
+        self._n = 0
+        with self._writer(rebuild):
+            pass
+
+    # -- index bookkeeping --------------------------------------------------
+
+    def _index_path(self, law, band):
+        return os.path.join(self.index_dir, f"{law}.{band}.idx")
+
+    @staticmethod
+    def _truncate(path, size):
+        """Cut path down to whole size-byte items; returns the item count."""
+        n, rest = divmod(os.path.getsize(path), size)
+        if rest:
+            with open(path, "r+b") as f:
+                f.truncate(n * size)
+        return n
+
+    def _repair(self, log):
+        """
+        Drop a partial trailing record (crash mid-write) from the open log
+        and a partial trailing entry from every index. Caller holds the
+        lock. Returns the log record count.
+        """
+        n, rest = divmod(os.fstat(log.fileno()).st_size, RECORD.size)
+        if rest:
+            os.ftruncate(log.fileno(), n * RECORD.size)
+        # meta is written last, so a torn index write always leaves it behind
+        if rest or self._indexed() != n:
+            for name in os.listdir(self.index_dir):
+                if name.endswith(".idx"):
+                    self._truncate(os.path.join(self.index_dir, name), ENTRY.size)
+        return n
+
+    @contextlib.contextmanager
+    def _writer(self, rebuild=False):
+        """
+        Open the log for appending under an exclusive lock, then re-read the
+        log length, repair torn writes and index any records another writer
+        left unindexed, so this instance's view is current while it writes.
+        With rebuild=True all index files are dropped first.
+        """
+        with open(self.log_path, "ab") as log, _exclusive(log):
+            if rebuild:
+                for name in os.listdir(self.index_dir):
+                    os.remove(os.path.join(self.index_dir, name))
+            self._n = self._repair(log)
+            self._last = {}
+            self._catch_up()
+            yield log
+
+    def _records_in_log(self):
+        return self._n
+
+    def _indexed(self):
+        if not os.path.exists(self.meta_path):
+            return 0
+        with open(self.meta_path, "r") as f:
+            return int(f.read().strip() or 0)
+
+    def _set_indexed(self, n):
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(str(n))
+        os.replace(tmp, self.meta_path)
+
+    def _last_entry(self, law, band):
+        """Last (t_us, rec_no) in one index, or None if it is empty."""
+        key = (law, band)
+        if key not in self._last:
+            p = self._index_path(law, band)
+            entry = None
+            if os.path.exists(p) and os.path.getsize(p) >= ENTRY.size:
+                with open(p, "rb") as f:
+                    f.seek(-ENTRY.size, os.SEEK_END)
+                    entry = ENTRY.unpack(f.read(ENTRY.size))
+            self._last[key] = entry
+        return self._last[key]
+
+    def _index_entries(self, groups):
+        """Append {(law, band): [(t_us, rec_no), ...]} with one write per index."""
+        for (law, band), entries in groups.items():
+            with open(self._index_path(law, band), "ab") as f:
+                f.write(b"".join(ENTRY.pack(t_us, rec_no) for t_us, rec_no in entries))
+            self._last[(law, band)] = entries[-1]
+
+    def _catch_up(self):
+        """
+        Index log records written after the last recorded index update.
+        Records whose entry already reached the index (crash after the index
+        write but before the meta update) are recognised by record number.
+        """
+        n_log = self._n
+        n_idx = self._indexed()
+        if n_idx > n_log:
+            raise ValueError(
+                f"index is ahead of log in {self.path}; open with rebuild=True "
+                "(result_store.py DIR --rebuild)"
+            )
+        if n_idx == n_log:
+            return
+        groups = {}
+        tail = {}
+        with open(self.log_path, "rb") as f:
+            f.seek(n_idx * RECORD.size)
+            for rec_no in range(n_idx, n_log):
+                law_b, t_us, m, a, band_i, digest = RECORD.unpack(f.read(RECORD.size))
+                law = law_b.rstrip(b"\0").decode("ascii")
+                band = BAND_CODES[band_i]
+                key = (law, band)
+                last = tail.get(key) or self._last_entry(law, band)
+                if last is not None and (rec_no <= last[1] or t_us < last[0]):
+                    continue   # already indexed, or would break index ordering
+                tail[key] = (t_us, rec_no)
+                groups.setdefault(key, []).append((t_us, rec_no))
+        self._index_entries(groups)
+        self._set_indexed(n_log)
+
+    def rebuild_index(self):
+        """Drop all index files and re-index the whole log."""
+        with self._writer(rebuild=True):
+            pass
+
+    # -- writes ---------------------------------------------------------------
+
+    def append(self, law, m, a, digest=b"", t=None):
+        """
+        Append one result. law is a short id such as "L07" (<= 4 ASCII chars),
+        t is a UNIX timestamp in seconds (defaults to now).
+        """
+        return self.append_many([(law, m, a, digest, t)])[0]
+
+    def append_many(self, rows):
+        """
+        Append a batch of (law, m, a, digest, t) rows, fields as in append().
+
+        The whole batch is checked before anything is written; then the log
+        and each touched index get one write and the meta file one update.
+        Returns the range of record numbers assigned.
+        """
+        rows = list(rows)
+        with self._writer() as log:
+            first = self._n
+            buf = bytearray()
+            groups = {}
+            tail = {}
+            now = time.time()
+            for rec_no, (law, m, a, digest, t) in enumerate(rows, first):
+                law_b = law.encode("ascii")
+                if len(law_b) > 4:
+                    raise ValueError(f"law id longer than 4 bytes: {law!r}")
+                t_us = int(round((now if t is None else t) * 1e6))
+                band = band_code(a)
+                key = (law, band)
+                last = tail.get(key) or self._last_entry(law, band)
+                if last is not None and t_us < last[0]:
+                    raise ValueError(f"out-of-order append for {law} {band}: {t_us} < {last[0]}")
+                tail[key] = (t_us, rec_no)
+                band_i = BAND_CODES.index(band)
+                buf += RECORD.pack(law_b, t_us, float(m), float(a), band_i, digest[:16])
+                groups.setdefault(key, []).append((t_us, rec_no))
+
+            n = len(buf) // RECORD.size
+            if n:
+                log.write(buf)
+                log.flush()   # log bytes land before their index entries
+                self._n = first + n
+                self._index_entries(groups)
+                self._set_indexed(self._n)
+        return range(first, first + n)
+
+    # -- reads ----------------------------------------------------------------
+
+    def _entries(self, law, band, t0_us, t1_us):
+        """Yield (t_us, rec_no) from one index with t0_us <= t_us < t1_us."""
+        p = self._index_path(law, band)
+        if not os.path.exists(p):
+            return
+        n = os.path.getsize(p) // ENTRY.size
+        with open(p, "rb") as f:
+            lo, hi = 0, n
+            while lo < hi:
+                mid = (lo + hi) // 2
+                f.seek(mid * ENTRY.size)
+                if ENTRY.unpack(f.read(ENTRY.size))[0] < t0_us:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            f.seek(lo * ENTRY.size)
+            for _ in range(lo, n):
+                t_us, rec_no = ENTRY.unpack(f.read(ENTRY.size))
+                if t_us >= t1_us:
+                    break
+                yield t_us, rec_no
+
+    def query(self, law, band=None, since=None, until=None):
+        """
+        Return [(t, law, m, a, band, digest_hex)] for one law, optionally one
+        band ("A+", "A0", "A-"), within [since, until) UNIX seconds, by time.
+        """
+        t0_us = -(1 << 63) if since is None else int(round(since * 1e6))
+        t1_us = (1 << 63) - 1 if until is None else int(round(until * 1e6))
+        bands = BAND_CODES if band is None else (band,)
+
+        hits = []
+        for b in bands:
+            hits.extend(self._entries(law, b, t0_us, t1_us))
+        hits.sort()
+
+        out = []
+        if not hits:
+            return out
+        with open(self.log_path, "rb") as f:
+            for _, rec_no in hits:
+                f.seek(rec_no * RECORD.size)
+                law_b, t_us, m, a, band_i, digest = RECORD.unpack(f.read(RECORD.size))
+                out.append((
+                    t_us / 1e6,
+                    law_b.rstrip(b"\0").decode("ascii"),
+                    m,
+                    a,
+                    BAND_CODES[band_i],
+                    digest.hex(),
+                ))
+        return out
+
+    def count(self, law, band=None, since=None, until=None):
+        """Number of matching records, read from the index only."""
+        t0_us = -(1 << 63) if since is None else int(round(since * 1e6))
+        t1_us = (1 << 63) - 1 if until is None else int(round(until * 1e6))
+        bands = BAND_CODES if band is None else (band,)
+        return sum(1 for b in bands for _ in self._entries(law, b, t0_us, t1_us))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Query the runner result store.")
+    ap.add_argument("store", help="store directory")
+    ap.add_argument("--law", help="law id, e.g. L07")
+    ap.add_argument("--band", choices=BAND_CODES)
+    ap.add_argument("--since-days", type=float, help="only the last N days")
+    ap.add_argument("--rebuild", action="store_true", help="rebuild the index first")
+    args = ap.parse_args()
+
+    store = ResultStore(args.store, rebuild=args.rebuild)
+
+    since = time.time() - args.since_days * 86400.0 if args.since_days else None
+
+    if not args.law:
+        print("records in log:", store._records_in_log())
+        for name in sorted(os.listdir(store.index_dir)):
+            if name.endswith(".idx"):
+                n = os.path.getsize(os.path.join(store.index_dir, name)) // ENTRY.size
+                print(f"  {name[:-4]:8s} {n}")
+        return
+
+    for t, law, m, a, band, digest in store.query(args.law, args.band, since):
+        stamp = datetime.datetime.fromtimestamp(t).isoformat(timespec="seconds")
+        print(f"{stamp}  {law}  m={m:.4f}, a={a:+.4f} [{band}]  {digest}")
+
+
+if __name__ == "__main__":
+    main()
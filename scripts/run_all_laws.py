@@ -1,11 +1,22 @@
 # run_all_laws.py  (ASCII-only)
 # Runner for bounded classical law POCs (L01..L10)
 
+import hashlib
+import json
 import subprocess
 import sys
 import os
 
 
+# Content-hash result cache: a scenario is re-run only when its source
+# (which holds its inputs) or the interpreter version changes.
+CACHE_VERSION = 1
+RUNNER_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE = os.path.join(RUNNER_DIR, ".runner_cache.json")
+
+USAGE = "usage: run_all_laws.py [--store DIR] [--cache FILE | --no-cache] [scenario.py ...]"
+
+
 def classify_band(a):
     """Simple band policy based on |a|."""
     x = abs(a)
@@ -36,16 +47,77 @@ def parse_ssm_line(line):
         return None, None
 
 
-def run_script(script_name):
-    """Run one law scenario script and print a runner summary."""
+def resolve_script(script_name):
+    """Bare scenario names live next to the runner; other paths are used as given."""
+    if os.path.dirname(script_name):
+        return script_name
+    return os.path.join(RUNNER_DIR, script_name)
+
+
+def scenario_hash(script_name):
+    """sha256 over cache version, interpreter version and script source."""
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSION}\0{sys.version}\0".encode("utf-8"))
+    with open(script_name, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def load_cache(path):
+    """Return the cache dict stored at path, or an empty one."""
+    try:
+        with open(path, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("scenarios", {})
+
+
+def save_cache(path, cache):
+    """Write the cache atomically (tmp file + rename)."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"version": CACHE_VERSION, "scenarios": cache}, f, indent=1)
+    os.replace(tmp, path)
+
+
+def run_script(script_name, cache=None):
+    """
+    Run one law scenario script and print a runner summary.
+
+    Bare names are looked up next to the runner, so it works from any
+    directory. If cache is a dict, a matching content hash serves the stored
+    output instead of running the script; fresh successful runs are added
+    to it. Returns (m, a, status), status one of "recomputed", "cached",
+    "missing".
+    """
     print(f"--- {script_name} ---")
-    if not os.path.exists(script_name):
+    path = resolve_script(script_name)
+    if not os.path.exists(path):
         print(f"[runner] ERROR: script not found: {script_name}")
         print()
-        return
+        return None, None, "missing"
+
+    key = os.path.relpath(os.path.abspath(path), RUNNER_DIR)
+    digest = scenario_hash(path) if cache is not None else None
+    entry = cache.get(key) if cache is not None else None
+
+    if entry is not None and entry.get("hash") == digest:
+        if entry["stdout"]:
+            print(entry["stdout"].rstrip())
+        m_val, a_val = entry["m"], entry["a"]
+        band = classify_band(a_val)
+        print(
+            "[runner] summary (cached):",
+            f"m={m_val:.4f}, a={a_val:+.4f} [{band}]"
+        )
+        print()
+        return m_val, a_val, "cached"
 
     proc = subprocess.run(
-        [sys.executable, script_name],
+        [sys.executable, path],
         capture_output=True,
         text=True,
     )
@@ -78,6 +150,34 @@ def run_script(script_name):
 
     print()  # blank line
 
+    if (cache is not None and proc.returncode == 0
+            and m_val is not None and a_val is not None):
+        cache[key] = {"hash": digest, "stdout": proc.stdout, "m": m_val, "a": a_val}
+
+    return m_val, a_val, "recomputed"
+
+
+def law_id(script_name):
+    """'scenario_L07_bernoulli.py' -> 'L07' (falls back to the file stem)."""
+    for part in os.path.basename(script_name).split("_"):
+        if len(part) == 3 and part[0] == "L" and part[1:].isdigit():
+            return part
+    return os.path.splitext(os.path.basename(script_name))[0][:4]
+
+
+def pop_option(args, flag):
+    """Remove '--flag VALUE' from args and return VALUE (None if absent)."""
+    if flag not in args:
+        return None
+    i = args.index(flag)
+    if i + 1 >= len(args) or args[i + 1].startswith("--"):
+        print(USAGE)
+        print(f"run_all_laws.py: error: {flag} needs a value")
+        sys.exit(2)
+    value = args[i + 1]
+    del args[i:i + 2]
+    return value
+
 
 def main():
     all_scenarios = [
@@ -93,15 +193,55 @@ def main():
     "scenario_L10_faraday_induction.py",
 ]
 
-    import sys
-    if len(sys.argv) > 1:
-        scenarios = sys.argv[1:]
+    args = sys.argv[1:]
+
+    # optional: --store DIR appends every parsed result to a result store
+    store = None
+    store_dir = pop_option(args, "--store")
+    if store_dir is not None:
+        from result_store import ResultStore, input_digest
+        store = ResultStore(store_dir)
+        stored = []
+
+    # result cache is on by default; --cache FILE moves it, --no-cache skips it
+    cache_path = pop_option(args, "--cache") or DEFAULT_CACHE
+    if "--no-cache" in args:
+        args.remove("--no-cache")
+        cache_path = None
+    cache = load_cache(cache_path) if cache_path else None
+
+    if args:
+        scenarios = args
     else:
         scenarios = all_scenarios
 
     print("Running bounded classical law scenarios...\n")
+    outcome = {"recomputed": [], "cached": [], "missing": []}
     for script in scenarios:
-        run_script(script)
+        m_val, a_val, status = run_script(script, cache)
+        outcome[status].append(script)
+        if store is not None and m_val is not None and a_val is not None:
+            with open(resolve_script(script), "rb") as f:
+                digest = input_digest(f.read())
+            stored.append((law_id(script), m_val, a_val, digest, None))
+
+    if store is not None:
+        store.append_many(stored)
+
+    if cache is not None:
+        save_cache(cache_path, cache)
+        print(
+            f"[runner] cache: {len(outcome['recomputed'])} recomputed,",
+            f"{len(outcome['cached'])} from cache"
+        )
+        for script in outcome["recomputed"]:
+            print(f"  recomputed: {script}")
+        for script in outcome["cached"]:
+            print(f"  cached:     {script}")
+    if outcome["missing"]:
+        print(f"[runner] {len(outcome['missing'])} scenario(s) not found:")
+        for script in outcome["missing"]:
+            print(f"  missing:    {script}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,242 @@
+# sensitivity_lanes.py  (ASCII-only)
+# One-pass reverse sensitivity of an output lane a to every input lane
+#
+# The ssm_align_* verbs are recorded on a small tape while the law is
+# evaluated. A single reverse sweep then gives d a_out / d a_in for every
+# input alignment (and d a_out / d m_i for the pooling weights), at roughly
+# the cost of one more forward evaluation.
+#
+# Local derivatives used by the sweep:
+#     clamp_a(z)      -> 1 inside (-1+eps_a, 1-eps_a), 0 outside
+#     atanh(a)        -> 1 / (1 - a^2)
+#     tanh(U)         -> 1 - tanh(U)^2
+#     U/W pooling     -> d/du_i = w_i / W,  d/dw_i = (u_i - U/W) / W
+#     w_i = |m_i|^g   -> d/dm_i = g * |m_i|^(g-1) * sign(m_i)
+#
+# Usage:
+#     python sensitivity_lanes.py                 # L04 attribution at scenario inputs
+#     python sensitivity_lanes.py rows.csv [--out grads.csv]
+#         rows.csv: T1_m, T1_a, T2_m, T2_a, V_a, n_a   (one L04 evaluation per line)
+
+import argparse
+import math
+import time
+
+
+def clamp(a, e=1e-6):
+    return max(-1 + e, min(1 - e, float(a)))
+
+
+def classify_band(a):
+    """Simple band policy based on |a| (same as run_all_laws.py)."""
+    x = abs(a)
+    if x < 0.20:
+        return "A+ (calm)"
+    elif x < 0.50:
+        return "A0 (borderline)"
+    else:
+        return "A- (stressed)"
+
+
+class LaneTape:
+    """
+    Records alignment-lane operations for a reverse (adjoint) sweep.
+
+    Every value on the tape is an integer node id. Inputs are created with
+    var(); the ssm_align_* methods mirror the scenario helpers and return
+    the node id of their output.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.parents = []   # per node: list of (parent_id, d node / d parent)
+
+    def _push(self, value, parents):
+        self.values.append(value)
+        self.parents.append(parents)
+        return len(self.values) - 1
+
+    def var(self, value):
+        return self._push(float(value), [])
+
+    def value(self, node):
+        return self.values[node]
+
+    def _rapidity(self, node, eps):
+        """u := atanh(clamp_a(a)) and du/da for a lane node."""
+        a = self.values[node]
+        a_c = clamp(a, eps)
+        u = 0.5 * math.log((1.0 + a_c) / (1.0 - a_c))
+        du = 1.0 / (1.0 - a_c * a_c) if a_c == a else 0.0
+        return u, du
+
+    def ssm_align_sum(self, nodes, eps=1e-6):
+        """a_out := tanh(atanh(a1_c) + atanh(a2_c) + ...)"""
+        U = 0.0
+        dus = []
+        for n in nodes:
+            u, du = self._rapidity(n, eps)
+            U += u
+            dus.append(du)
+        a_out = math.tanh(U)
+        g = 1.0 - a_out * a_out
+        return self._push(a_out, [(n, g * du) for n, du in zip(nodes, dus)])
+
+    def ssm_align_product(self, n1, n2, eps=1e-6):
+        """a_out := tanh(atanh(a1_c) + atanh(a2_c))"""
+        return self.ssm_align_sum([n1, n2], eps)
+
+    def ssm_align_div(self, n_num, n_den, eps=1e-6):
+        """a_out := tanh(atanh(a_num_c) - atanh(a_den_c))"""
+        u_num, du_num = self._rapidity(n_num, eps)
+        u_den, du_den = self._rapidity(n_den, eps)
+        a_out = math.tanh(u_num - u_den)
+        g = 1.0 - a_out * a_out
+        return self._push(a_out, [(n_num, g * du_num), (n_den, -g * du_den)])
+
+    def ssm_align_weighted(self, pairs, gamma=1.0, eps=1e-12):
+        """
+        pairs: iterable of (a_node, m_node), weight w := |m|^gamma
+        a_out := tanh(U / max(W, eps))
+        """
+        us, dus, ws, dws = [], [], [], []
+        for a_node, m_node in pairs:
+            u, du = self._rapidity(a_node, 1e-6)
+            m = self.values[m_node]
+            w = abs(m) ** gamma
+            dw = gamma * abs(m) ** (gamma - 1.0) * math.copysign(1.0, m) if m != 0.0 else 0.0
+            us.append(u)
+            dus.append(du)
+            ws.append(w)
+            dws.append(dw)
+        U = sum(w * u for w, u in zip(ws, us))
+        W = sum(ws)
+        if W > eps:
+            Wd = W
+            mean = U / W
+        else:
+            Wd = eps
+            mean = None
+        a_out = math.tanh(U / Wd)
+        g = 1.0 - a_out * a_out
+        parents = []
+        for (a_node, m_node), u, du, w, dw in zip(pairs, us, dus, ws, dws):
+            parents.append((a_node, g * du * w / Wd))
+            # d(U/W)/dw_i; W is frozen at eps when it is clamped
+            dq = (u - mean) / Wd if mean is not None else u / Wd
+            parents.append((m_node, g * dq * dw))
+        return self._push(a_out, parents)
+
+    def grad(self, out_node):
+        """Reverse sweep: return adjoints d out / d node for every node."""
+        adj = [0.0] * len(self.values)
+        adj[out_node] = 1.0
+        for node in range(out_node, -1, -1):
+            g = adj[node]
+            if g == 0.0:
+                continue
+            for parent, local in self.parents[node]:
+                adj[parent] += g * local
+        return adj
+
+
+def eval_L04(T1_m, T1_a, T2_m, T2_a, V_a, n_a, R_a=0.0, grad=False):
+    """
+    Ideal gas pressure lane exactly as scenario_L04:
+        a_T   := weighted pool of (T1_a, T1_m), (T2_a, T2_m)
+        a_nRT := sum(n_a, R_a, a_T)
+        a_P   := div(a_nRT, V_a)
+
+    Returns a_P, or (a_P, partials) when grad=True, where partials maps
+    each input name to d a_P / d input.
+    """
+    tape = LaneTape()
+    inputs = {
+        "T1_a": tape.var(T1_a),
+        "T2_a": tape.var(T2_a),
+        "V_a": tape.var(V_a),
+        "n_a": tape.var(n_a),
+        "R_a": tape.var(R_a),
+        "T1_m": tape.var(T1_m),
+        "T2_m": tape.var(T2_m),
+    }
+    a_T = tape.ssm_align_weighted(
+        [(inputs["T1_a"], inputs["T1_m"]), (inputs["T2_a"], inputs["T2_m"])],
+        gamma=1.0,
+        eps=1e-12,
+    )
+    a_nRT = tape.ssm_align_sum([inputs["n_a"], inputs["R_a"], a_T])
+    a_P = tape.ssm_align_div(a_nRT, inputs["V_a"], eps=1e-6)
+
+    a_out = tape.value(a_P)
+    if not grad:
+        return a_out
+    adj = tape.grad(a_P)
+    return a_out, {name: adj[node] for name, node in inputs.items()}
+
+
+LANE_INPUTS = ("T1_a", "T2_a", "V_a", "n_a")
+
+
+def attribute(partials, lanes):
+    """
+    Rank lane inputs by their first-order contribution |d a / d a_i * a_i|.
+    Returns (name, contribution) pairs, largest first.
+    """
+    contrib = [(name, partials[name] * lanes[name]) for name in LANE_INPUTS]
+    contrib.sort(key=lambda p: abs(p[1]), reverse=True)
+    return contrib
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Reverse lane sensitivities (L04).")
+    ap.add_argument("path", nargs="?", help="rows: T1_m, T1_a, T2_m, T2_a, V_a, n_a")
+    ap.add_argument("--out", help="write a_P, partials and driver per row")
+    args = ap.parse_args()
+
+    if not args.path:
+        # scenario_L04 inputs
+        row = dict(T1_m=295.0, T1_a=+0.55, T2_m=305.0, T2_a=+0.12, V_a=+0.10, n_a=+0.02)
+        a_P, partials = eval_L04(**row, grad=True)
+
+        print("SSM (pressure lane):", f"a_P={a_P:+.4f} [{classify_band(a_P)}]")
+        print("Sensitivities d a_P / d input:")
+        for name, d in partials.items():
+            print(f"  {name:5s} {d:+.6f}")
+        print("Attribution (d a_P / d a_i * a_i):")
+        for name, c in attribute(partials, row):
+            print(f"  {name:5s} {c:+.4f}")
+        return
+
+    out = open(args.out, "w") if args.out else None
+    names = ("T1_m", "T1_a", "T2_m", "T2_a", "V_a", "n_a")
+    drivers = dict.fromkeys(LANE_INPUTS, 0)
+    rows = 0
+    t0 = time.perf_counter()
+    try:
+        with open(args.path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                row = dict(zip(names, (float(p) for p in line.split(","))))
+                a_P, partials = eval_L04(**row, grad=True)
+                top = attribute(partials, row)[0][0]
+                drivers[top] += 1
+                rows += 1
+                if out is not None:
+                    grads = ",".join(f"{partials[n]!r}" for n in LANE_INPUTS)
+                    out.write(f"{a_P!r},{grads},{top}\n")
+    finally:
+        if out is not None:
+            out.close()
+    elapsed = time.perf_counter() - t0
+
+    print("rows =", rows, " elapsed =", f"{elapsed:.2f}", "s")
+    print("Dominant lane input per row:")
+    for name, count in drivers.items():
+        print(f"  {name:5s} {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# shard_pool.py  (ASCII-only)
+# Multi-core pooling of very large (m, a) batches through shared memory
+#
+# The m and a arrays (float64) are placed in multiprocessing.shared_memory
+# once. Worker processes attach by name and compute partial rapidity sums
+#     U_b := SUM_i (w_i * u_i),  W_b := SUM_i w_i      (weighted)
+#     U_b := SUM_i u_i                                 (sum)
+# over fixed-size blocks b, reading the shared buffers in place (no copy,
+# no pickling of data). The parent reduces the block partials in block
+# order, so the result is bit-identical for any number of workers,
+# including the single-core path (workers=1).
+#
+# Input: raw little-endian float64 files of equal length (m.f64, a.f64).
+#
+# Usage:
+#     python shard_pool.py --m m.f64 --a a.f64 [--op weighted] [--workers 8]
+#     python shard_pool.py --demo 20000000 [--workers 8]
+
+import argparse
+import math
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+from array import array
+from multiprocessing import shared_memory
+
+
+BLOCK = 1 << 16   # elements per block; fixes the summation order
+
+_ATTACHED = {}
+
+
+def _attach(name):
+    """Attach (once per worker) to a shared float64 buffer."""
+    shm = _ATTACHED.get(name)
+    if shm is None:
+        shm = _ATTACHED[name] = shared_memory.SharedMemory(name=name)
+    return shm.buf.cast("d")
+
+
+def _block_partials(task):
+    """
+    Worker: partial (U, W) for blocks [b0, b1).
+    task = (m_name, a_name, n, b0, b1, op, gamma, eps)
+    """
+    m_name, a_name, n, b0, b1, op, gamma, eps = task
+    a_view = _attach(a_name)
+    m_view = _attach(m_name) if op == "weighted" else None
+    lo = -1.0 + eps
+    hi = 1.0 - eps
+    log = math.log
+    out = []
+    for b in range(b0, b1):
+        i = b * BLOCK
+        j = min(n, i + BLOCK)
+        a_blk = a_view[i:j]
+        U = 0.0
+        W = 0.0
+        if op == "weighted":
+            m_blk = m_view[i:j]
+            if gamma == 1.0:
+                for a, m in zip(a_blk, m_blk):
+                    a = lo if a < lo else hi if a > hi else a
+                    w = abs(m)
+                    U += w * 0.5 * log((1.0 + a) / (1.0 - a))
+                    W += w
+            else:
+                for a, m in zip(a_blk, m_blk):
+                    a = lo if a < lo else hi if a > hi else a
+                    w = abs(m) ** gamma
+                    U += w * 0.5 * log((1.0 + a) / (1.0 - a))
+                    W += w
+            m_blk.release()
+        else:
+            for a in a_blk:
+                a = lo if a < lo else hi if a > hi else a
+                U += 0.5 * log((1.0 + a) / (1.0 - a))
+        a_blk.release()
+        out.append((U, W))
+    return b0, out
+
+
+class SharedLanes:
+    """
+    Owns two shared float64 buffers (m and a) of length n.
+    Use as a context manager so the segments are unlinked afterwards.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        size = max(8, 8 * n)
+        self.m_shm = shared_memory.SharedMemory(create=True, size=size)
+        self.a_shm = shared_memory.SharedMemory(create=True, size=size)
+
+    @classmethod
+    def from_files(cls, m_path, a_path):
+        """Load raw float64 files straight into shared memory."""
+        n = os.path.getsize(a_path) // 8
+        if os.path.getsize(m_path) // 8 != n:
+            raise ValueError("m and a files differ in length")
+        lanes = cls(n)
+        for path, shm in ((m_path, lanes.m_shm), (a_path, lanes.a_shm)):
+            with open(path, "rb") as f:
+                f.readinto(shm.buf[:8 * n])
+        return lanes
+
+    def m(self):
+        return self.m_shm.buf.cast("d")[:self.n]
+
+    def a(self):
+        return self.a_shm.buf.cast("d")[:self.n]
+
+    def close(self):
+        for shm in (self.m_shm, self.a_shm):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def pool_shared(lanes, op="weighted", gamma=1.0, workers=None, eps=1e-6, eps_w=1e-12):
+    """
+    Pooled alignment over all n readings in lanes.
+
+    op="weighted": a_out := tanh(U / max(W, eps_w)), w := |m|^gamma
+    op="sum":      a_out := tanh(U)
+    Returns (a_out, U, W).
+    """
+    if op not in ("weighted", "sum"):
+        raise ValueError(f"unknown op: {op!r}")
+    n = lanes.n
+    n_blocks = (n + BLOCK - 1) // BLOCK
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, n_blocks or 1))
+
+    # contiguous block ranges, a few per worker for load balancing
+    n_tasks = min(n_blocks, workers * 4) or 1
+    edges = [n_blocks * k // n_tasks for k in range(n_tasks + 1)]
+    tasks = [
+        (lanes.m_shm.name, lanes.a_shm.name, n, edges[k], edges[k + 1], op, gamma, eps)
+        for k in range(n_tasks)
+        if edges[k] < edges[k + 1]
+    ]
+
+    if workers == 1:
+        # in-process: use our own segments instead of attaching again
+        _ATTACHED[lanes.m_shm.name] = lanes.m_shm
+        _ATTACHED[lanes.a_shm.name] = lanes.a_shm
+        try:
+            results = [_block_partials(t) for t in tasks]
+        finally:
+            del _ATTACHED[lanes.m_shm.name]
+            del _ATTACHED[lanes.a_shm.name]
+    else:
+        with mp.Pool(workers) as pool:
+            results = pool.map(_block_partials, tasks)
+
+    # reduce in block order: identical for any worker count
+    results.sort()
+    U = 0.0
+    W = 0.0
+    for _, blocks in results:
+        for U_b, W_b in blocks:
+            U += U_b
+            W += W_b
+
+    if op == "weighted":
+        a_out = math.tanh(U / max(W, eps_w))
+    else:
+        a_out = math.tanh(U)
+    return a_out, U, W
+
+
+def fill_demo(lanes, seed=33):
+    """Readings in the spirit of scenario_L01 current samples."""
+    rng = random.Random(seed)
+    m_view = lanes.m()
+    a_view = lanes.a()
+    for i in range(0, lanes.n, BLOCK):
+        j = min(lanes.n, i + BLOCK)
+        m_view[i:j] = array("d", (rng.uniform(1.8, 2.1) for _ in range(j - i)))
+        a_view[i:j] = array("d", (rng.uniform(-0.2, 0.8) for _ in range(j - i)))
+    m_view.release()
+    a_view.release()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Shared-memory multi-core pooling.")
+    ap.add_argument("--m", help="raw float64 magnitudes")
+    ap.add_argument("--a", help="raw float64 alignments")
+    ap.add_argument("--op", choices=("weighted", "sum"), default="weighted")
+    ap.add_argument("--gamma", type=float, default=1.0)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--demo", type=int, default=0,
+                    help="pool N synthetic readings instead of reading files")
+    ap.add_argument("--check", action="store_true",
+                    help="also run the single-core path and compare")
+    args = ap.parse_args()
+
+    if sys.byteorder != "little" and not args.demo:
+        raise SystemExit("raw float64 input is little-endian; unsupported host")
+
+    if args.demo > 0:
+        lanes = SharedLanes(args.demo)
+        fill_demo(lanes)
+    elif args.m and args.a:
+        lanes = SharedLanes.from_files(args.m, args.a)
+    else:
+        ap.error("give --m and --a files, or --demo N")
+
+    with lanes:
+        t0 = time.perf_counter()
+        a_out, U, W = pool_shared(lanes, args.op, args.gamma, args.workers)
+        elapsed = time.perf_counter() - t0
+
+        print("readings =", lanes.n)
+        print("SSM (pooled lane):", f"a={a_out:+.6f}")
+        print("  U =", repr(U), " W =", repr(W))
+        print("  elapsed =", f"{elapsed:.2f}", "s,",
+              f"{lanes.n / max(elapsed, 1e-9):,.0f}", "readings/s")
+
+        if args.check:
+            t0 = time.perf_counter()
+            a_one, U_one, W_one = pool_shared(lanes, args.op, args.gamma, workers=1)
+            elapsed_one = time.perf_counter() - t0
+            same = "identical" if (a_one, U_one, W_one) == (a_out, U, W) else "DIFFERENT"
+            print("  single-core:", f"a={a_one:+.6f}", f"({elapsed_one:.2f} s)", same)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+# stream_L10_faraday_emf.py  (ASCII-only)
+# Law L10: streaming Faraday pipeline for long flux recordings
+# Classical: |eps| = N * |dPhi/dt|,  dPhi/dt ~ (Phi[k+1] - Phi[k]) / (t[k+1] - t[k])
+#
+# The recording is read in fixed-size chunks; only the last sample of each
+# chunk is carried over, so memory stays bounded by the chunk size no matter
+# how long the recording is.
+#
+# When numpy is installed each chunk is processed column-wise (np.diff on t
+# and Phi, clip / rapidity / tanh on the a column); otherwise a pure-Python
+# loop is used. Both paths give the same steps up to float rounding of
+# log/tanh, wherever the chunk boundaries fall (--check compares them).
+#
+# Input file (text, one sample per line, '#' lines ignored):
+#     t, Phi_m, Phi_a        # s, Wb, alignment of that flux sample
+#
+# Usage:
+#     python stream_L10_faraday_emf.py flux.csv [--out emf.csv] [--chunk 65536]
+#     python stream_L10_faraday_emf.py --demo 1000000 [--no-numpy] [--check]
+
+import argparse
+import math
+import time
+
+from result_store import add_store_option, store_results
+
+try:
+    import numpy as np
+except ImportError:   # optional: vectorized per-chunk path
+    np = None
+
+
+def clamp(a, e=1e-6):
+    return max(-1 + e, min(1 - e, float(a)))
+
+
+def atanh_c(a_raw, eps=1e-6):
+    """atanh(clamp_a(a)) written as 0.5 * ln((1+a)/(1-a))."""
+    a = clamp(a_raw, eps)
+    return 0.5 * math.log((1.0 + a) / (1.0 - a))
+
+
+def read_flux_chunks(path, chunk_size=65536):
+    """
+    Yield (t_list, phi_list, a_list) chunks of at most chunk_size samples.
+    """
+    t_buf, phi_buf, a_buf = [], [], []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            t_s, phi_s, a_s = line.split(",")[:3]
+            t_buf.append(float(t_s))
+            phi_buf.append(float(phi_s))
+            a_buf.append(float(a_s))
+            if len(t_buf) >= chunk_size:
+                yield t_buf, phi_buf, a_buf
+                t_buf, phi_buf, a_buf = [], [], []
+    if t_buf:
+        yield t_buf, phi_buf, a_buf
+
+
+def synthetic_flux_chunks(n_samples, chunk_size=65536, rate_hz=10000.0, arrays=False):
+    """
+    Rotating-magnet flux Phi(t) = Phi0 * sin(2*pi*f*t) with a slowly
+    breathing per-sample alignment. Used by --demo. With arrays=True
+    (numpy required) the chunks are numpy arrays instead of lists.
+    """
+    phi0 = 0.012
+    w = 2.0 * math.pi * 50.0
+    dt = 1.0 / rate_hz
+    k0 = 0
+    while k0 < n_samples:
+        k1 = min(n_samples, k0 + chunk_size)
+        if arrays:
+            t_buf = np.arange(k0, k1) * dt
+            phi_buf = phi0 * np.sin(w * t_buf)
+            a_buf = 0.25 + 0.20 * np.sin(0.5 * t_buf)
+        else:
+            t_buf = [k * dt for k in range(k0, k1)]
+            phi_buf = [phi0 * math.sin(w * t) for t in t_buf]
+            a_buf = [0.25 + 0.20 * math.sin(0.5 * t) for t in t_buf]
+        yield t_buf, phi_buf, a_buf
+        k0 = k1
+
+
+class FaradayStream:
+    """
+    Per-step Faraday lane over a chunked flux series.
+
+    For each step k -> k+1 (same chain as scenario_L10):
+        a_dPhi    := tanh(atanh(a_Phi[k]_c) + atanh(a_Phi[k+1]_c))
+        a_dPhi_dt := tanh(atanh(a_dPhi_c) - atanh(dt_a_c))
+        a_eps     := tanh(atanh(N_a_c) + atanh(a_dPhi_dt_c))
+
+    Each sample's rapidity is computed once and reused by both steps it
+    touches. The last sample of a chunk is carried into the next one.
+
+    vectorized=None uses the numpy path when numpy is importable; it then
+    returns numpy arrays from process() instead of lists.
+    """
+
+    def __init__(self, N_m=200, N_a=+0.02, dt_a=+0.10, eps=1e-6, vectorized=None):
+        if vectorized and np is None:
+            raise ValueError("vectorized=True needs numpy")
+        self.vectorized = np is not None if vectorized is None else bool(vectorized)
+        self.N_m = float(N_m)
+        self.eps = eps
+        self.u_N = atanh_c(N_a, eps)
+        self.u_dt = atanh_c(dt_a, eps)
+        # clamp_a in rapidity space: |u| <= atanh(1 - eps)
+        self.u_max = atanh_c(1.0, eps)
+
+        # carry-over from the previous chunk
+        self.last_t = None
+        self.last_phi = None
+        self.last_u = None
+
+        # running summary (weighted pooling of a_eps by |eps|)
+        self.steps = 0
+        self.U = 0.0
+        self.W = 0.0
+        self.eps_max = 0.0
+        self.eps_sum = 0.0
+        self.band_counts = {"A+ (calm)": 0, "A0 (borderline)": 0, "A- (stressed)": 0}
+
+    def process(self, t_buf, phi_buf, a_buf):
+        """
+        Consume one chunk; return (t_list, dPhi_dt_list, eps_mag_list, a_eps_list)
+        for the steps that end inside this chunk.
+        """
+        if self.vectorized:
+            return self._process_np(t_buf, phi_buf, a_buf)
+
+        eps = self.eps
+        lo = -1.0 + eps
+        hi = 1.0 - eps
+        log = math.log
+        tanh = math.tanh
+        u_max = self.u_max
+        u_N = self.u_N
+        u_dt = self.u_dt
+        N_m = self.N_m
+
+        u_buf = [
+            0.5 * log((1.0 + a) / (1.0 - a))
+            for a in (lo if x < lo else hi if x > hi else x for x in a_buf)
+        ]
+
+        if self.last_t is not None:
+            t_all = [self.last_t] + list(t_buf)
+            phi_all = [self.last_phi] + list(phi_buf)
+            u_all = [self.last_u] + u_buf
+        else:
+            t_all, phi_all, u_all = t_buf, phi_buf, u_buf
+
+        out_t, out_d, out_e, out_a = [], [], [], []
+        U = 0.0
+        W = 0.0
+        e_max = self.eps_max
+        e_sum = 0.0
+        n_calm = n_border = n_stress = 0
+
+        for k in range(len(t_all) - 1):
+            dt = t_all[k + 1] - t_all[k]
+            if dt <= 0.0:
+                raise ValueError(f"non-increasing time at t={t_all[k + 1]!r}")
+            d = (phi_all[k + 1] - phi_all[k]) / dt
+            e_mag = N_m * abs(d)
+
+            # sum of the two flux rapidities, clamped as a lane
+            u = u_all[k] + u_all[k + 1]
+            if u > u_max:
+                u = u_max
+            elif u < -u_max:
+                u = -u_max
+            # division by dt, clamped again before the N product
+            u -= u_dt
+            if u > u_max:
+                u = u_max
+            elif u < -u_max:
+                u = -u_max
+            a_eps = tanh(u + u_N)
+
+            out_t.append(t_all[k + 1])
+            out_d.append(d)
+            out_e.append(e_mag)
+            out_a.append(a_eps)
+
+            x = abs(a_eps)
+            if x < 0.20:
+                n_calm += 1
+            elif x < 0.50:
+                n_border += 1
+            else:
+                n_stress += 1
+
+            a_c = lo if a_eps < lo else hi if a_eps > hi else a_eps
+            U += e_mag * 0.5 * log((1.0 + a_c) / (1.0 - a_c))
+            W += e_mag
+            e_sum += e_mag
+            if e_mag > e_max:
+                e_max = e_mag
+
+        if len(t_buf):
+            self._carry(t_buf[-1], phi_buf[-1], u_buf[-1])
+        self._account(len(out_t), U, W, e_sum, e_max, n_calm, n_border, n_stress)
+        return out_t, out_d, out_e, out_a
+
+    def _process_np(self, t_buf, phi_buf, a_buf):
+        """Column-wise version of process() on numpy arrays."""
+        eps = self.eps
+        lo = -1.0 + eps
+        hi = 1.0 - eps
+        u_max = self.u_max
+
+        t = np.asarray(t_buf, dtype=float)
+        phi = np.asarray(phi_buf, dtype=float)
+        a = np.clip(np.asarray(a_buf, dtype=float), lo, hi)
+        u = 0.5 * np.log((1.0 + a) / (1.0 - a))
+
+        if self.last_t is not None:
+            t_all = np.concatenate(([self.last_t], t))
+            phi_all = np.concatenate(([self.last_phi], phi))
+            u_all = np.concatenate(([self.last_u], u))
+        else:
+            t_all, phi_all, u_all = t, phi, u
+
+        dt = np.diff(t_all)
+        bad = np.flatnonzero(~(dt > 0.0))
+        if bad.size:
+            raise ValueError(f"non-increasing time at t={float(t_all[bad[0] + 1])!r}")
+        d = np.diff(phi_all) / dt
+        e_mag = self.N_m * np.abs(d)
+
+        # same two lane clamps as the loop, in rapidity space
+        us = np.clip(u_all[:-1] + u_all[1:], -u_max, u_max)
+        us = np.clip(us - self.u_dt, -u_max, u_max)
+        a_eps = np.tanh(us + self.u_N)
+
+        x = np.abs(a_eps)
+        n = a_eps.size
+        n_calm = int(np.count_nonzero(x < 0.20))
+        n_border = int(np.count_nonzero(x < 0.50)) - n_calm
+        a_c = np.clip(a_eps, lo, hi)
+        U = float(np.dot(e_mag, 0.5 * np.log((1.0 + a_c) / (1.0 - a_c))))
+        W = float(e_mag.sum())
+        e_max = max(self.eps_max, float(e_mag.max())) if n else self.eps_max
+
+        if t.size:
+            self._carry(float(t[-1]), float(phi[-1]), float(u[-1]))
+        self._account(n, U, W, W, e_max, n_calm, n_border, n - n_calm - n_border)
+        return t_all[1:], d, e_mag, a_eps
+
+    def _carry(self, t, phi, u):
+        self.last_t = t
+        self.last_phi = phi
+        self.last_u = u
+
+    def _account(self, n, U, W, e_sum, e_max, n_calm, n_border, n_stress):
+        self.steps += n
+        self.U += U
+        self.W += W
+        self.eps_sum += e_sum
+        self.eps_max = e_max
+        self.band_counts["A+ (calm)"] += n_calm
+        self.band_counts["A0 (borderline)"] += n_border
+        self.band_counts["A- (stressed)"] += n_stress
+
+    def summary(self):
+        """Return (steps, eps_mean, eps_max, a_pooled) over everything seen."""
+        eps_mean = self.eps_sum / self.steps if self.steps else 0.0
+        a_pooled = math.tanh(self.U / max(self.W, 1e-12))
+        return self.steps, eps_mean, self.eps_max, a_pooled
+
+
+def check_paths(chunks, chunk_b=9973, **kw):
+    """
+    Run the loop path on the given chunks and the numpy path on the same
+    samples re-cut into chunk_b-sized chunks (other boundaries). Returns
+    (steps, max |diff| over dPhi/dt, |eps|, a_eps, max |diff| of summaries).
+    """
+    py = FaradayStream(vectorized=False, **kw)
+    cols = ([], [], [])
+    py_out = ([], [], [], [])
+    for chunk in chunks:
+        chunk = [list(c) for c in chunk]
+        for col, c in zip(cols, chunk):
+            col.extend(c)
+        for acc, res in zip(py_out, py.process(*chunk)):
+            acc.extend(res)
+
+    vec = FaradayStream(vectorized=True, **kw)
+    parts = [
+        vec.process(*(np.asarray(c[i:i + chunk_b]) for c in cols))
+        for i in range(0, len(cols[0]), chunk_b)
+    ]
+    vec_out = [np.concatenate([p[j] for p in parts]) for j in range(4)]
+
+    diffs = [
+        float(np.max(np.abs(np.asarray(p) - v), initial=0.0))
+        for p, v in zip(py_out[1:], vec_out[1:])
+    ]
+    s_py, s_vec = py.summary(), vec.summary()
+    if s_py[0] != s_vec[0] or py.band_counts != vec.band_counts:
+        raise AssertionError("loop and numpy paths disagree on steps or bands")
+    d_sum = max(abs(x - y) / max(abs(x), 1.0) for x, y in zip(s_py[1:], s_vec[1:]))
+    return s_py[0], diffs, d_sum
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Streaming Faraday EMF lane (L10).")
+    ap.add_argument("path", nargs="?", help="flux file: t, Phi_m, Phi_a per line")
+    ap.add_argument("--out", help="write t, dPhi_dt, eps, a_eps per step")
+    ap.add_argument("--chunk", type=int, default=65536)
+    ap.add_argument("--turns", type=float, default=200.0)
+    ap.add_argument("--turns-a", type=float, default=+0.02)
+    ap.add_argument("--dt-a", type=float, default=+0.10)
+    ap.add_argument("--demo", type=int, default=0,
+                    help="run on N synthetic samples instead of a file")
+    ap.add_argument("--no-numpy", action="store_true",
+                    help="use the pure-Python loop even if numpy is installed")
+    ap.add_argument("--check", action="store_true",
+                    help="compare the loop and numpy paths on the input and exit")
+    add_store_option(ap)
+    args = ap.parse_args()
+
+    vectorized = False if args.no_numpy else None
+    stream = FaradayStream(N_m=args.turns, N_a=args.turns_a, dt_a=args.dt_a,
+                           vectorized=vectorized)
+
+    if args.demo > 0:
+        chunks = synthetic_flux_chunks(args.demo, args.chunk,
+                                       arrays=stream.vectorized and not args.check)
+    elif args.path:
+        chunks = read_flux_chunks(args.path, args.chunk)
+    else:
+        ap.error("give a flux file or --demo N")
+
+    if args.check:
+        if np is None:
+            ap.error("--check needs numpy")
+        steps, (d_d, d_e, d_a), d_sum = check_paths(
+            chunks, N_m=args.turns, N_a=args.turns_a, dt_a=args.dt_a)
+        print(f"[check] {steps} steps, loop vs numpy max |diff|:",
+              f"dPhi/dt {d_d:.3g}, |eps| {d_e:.3g}, a_eps {d_a:.3g},",
+              f"summary (relative) {d_sum:.3g}")
+        return
+
+    out = open(args.out, "w") if args.out else None
+
+    t0 = time.perf_counter()
+    try:
+        for t_buf, phi_buf, a_buf in chunks:
+            res = stream.process(t_buf, phi_buf, a_buf)
+            if out is not None:
+                if stream.vectorized:
+                    res = [c.tolist() for c in res]
+                out.writelines(
+                    f"{t!r},{d!r},{e!r},{a!r}\n" for t, d, e, a in zip(*res)
+                )
+    finally:
+        if out is not None:
+            out.close()
+    elapsed = time.perf_counter() - t0
+
+    steps, eps_mean, eps_max, a_pooled = stream.summary()
+    rate = steps / elapsed if elapsed > 0 else float("inf")
+
+    print("Classical:")
+    print("  steps      =", steps)
+    print("  |eps| mean =", f"{eps_mean:.4f}", "V")
+    print("  |eps| max  =", f"{eps_max:.4f}", "V")
+
+    print("SSM (induced EMF lane, pooled by |eps|):")
+    for band, count in stream.band_counts.items():
+        print(f"  {band:16s} {count}")
+    print("  throughput =", f"{rate:,.0f}", "steps/s",
+          "(numpy)" if stream.vectorized else "(pure Python)")
+
+    print("SSM:", f"m={eps_mean:.4f}, a={a_pooled:+.4f}")
+    store_results(args, [("L10", eps_mean, a_pooled)])
+
+
+if __name__ == "__main__":
+    main()